@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Startup benchmark: postgres.py import va asosiy kirish nuqtalari
+
+Ishlatish:
+    python3 benchmarks/bench_startup.py --budget-ms 100
+
+`python -X importtime -c "import postgres"` dagi kumulyativ vaqt --budget-ms
+dan oshsa, skript 1 bilan chiqadi (CI uchun).
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from prettytable import PrettyTable
+
+ENTRY_POINTS = {
+    'import': "import postgres",
+    'config': "import postgres; postgres.config.DATABASE_URLS_FILE",
+    'url manager': "import postgres; postgres.DatabaseURLManager()",
+    'deployment manager': "import postgres; postgres.DeploymentManager()",
+}
+
+def run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable, *flags, '-c', code], env=env,
+                          capture_output=True, text=True, check=True)
+
+def wall_time(code: str, repeat: int) -> float:
+    """Eng yaxshi natija - yangi interpreter bilan, soniyalarda"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(code)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def import_times(repeat: int):
+    """-X importtime: (postgres kumulyativ µs, eng og'ir to'g'ridan-to'g'ri importlar)"""
+    best_total, best_children = float('inf'), []
+    for _ in range(repeat):
+        total, children = None, []
+        for line in run("import postgres", '-X', 'importtime').stderr.splitlines():
+            parts = line.partition('import time:')[2].split('|')
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            cumulative, name = int(parts[1]), parts[2].rstrip()
+            depth = len(name) - len(name.lstrip())
+            if name.strip() == 'postgres' and depth == 1:
+                total = cumulative
+            elif depth == 3:
+                children.append((cumulative, name.strip()))
+        if total is not None and total < best_total:
+            best_total, best_children = total, children
+    return best_total, sorted(best_children, reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help="import postgres uchun ruxsat etilgan kumulyativ vaqt")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = wall_time("pass", args.repeat)
+    table = PrettyTable(['entry point', 'wall ms', 'minus interpreter ms'])
+    for name, code in ENTRY_POINTS.items():
+        elapsed = wall_time(code, args.repeat)
+        table.add_row([name, f"{elapsed * 1000:.1f}", f"{(elapsed - baseline) * 1000:.1f}"])
+    print(table)
+
+    total, children = import_times(args.repeat)
+    heaviest = PrettyTable(['module', 'cumulative ms'])
+    for cumulative, name in children[:args.top]:
+        heaviest.add_row([name, f"{cumulative / 1000:.1f}"])
+    print(heaviest)
+
+    total_ms = total / 1000
+    print(f"import postgres: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        print("❌ import time budget exceeded", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -22,43 +22,49 @@ POSTGRESQL ENTERPRISE ULTIMATE SYSTEM - VERSION 5.0.0
 """
 
 import os
+import io
 import sys
 import json
 import time
 import psycopg2
 import psycopg2.pool
 import psycopg2.extras
-import hashlib# pyright: ignore[reportUnusedImport]
 import logging
 import datetime
 import threading
-import subprocess
 import urllib.parse
-import shutil
-import pickle # pyright: ignore[reportUnusedImport]
-import queue# pyright: ignore[reportUnusedImport]
 import signal
 import atexit
-import platform # pyright: ignore[reportUnusedImport]
-import socket # pyright: ignore[reportUnusedImport]
-import ssl # pyright: ignore[reportUnusedImport]
-import secrets
 import string
 import re
 import csv
-import ipaddress # pyright: ignore[reportUnusedImport]
-import requests # pyright: ignore[reportUnusedImport]
-import concurrent.futures
-from typing import Dict, List, Tuple, Optional, Any, Union, Callable # pyright: ignore[reportUnusedImport]
-from contextlib import contextmanager, closing
+import heapq
+import itertools
+import collections
+import weakref
+import array
+import mmap
+import zlib
+import struct
+import fcntl
+import codecs
+from typing import Dict, List, Tuple, Optional, Any, Union, Callable, Iterable, Iterator, Sequence, AsyncIterator # pyright: ignore[reportUnusedImport]
+from collections.abc import MutableMapping
+from contextlib import contextmanager, asynccontextmanager, closing
 from dataclasses import dataclass, field, asdict # pyright: ignore[reportUnusedImport]
 from enum import Enum, auto # pyright: ignore[reportUnusedImport]
-from prettytable import PrettyTable # pyright: ignore[reportUnusedImport]
 from colorama import init, Fore, Back, Style
-import getpass # pyright: ignore[reportUnusedImport]
-from functools import wraps
+from functools import wraps, lru_cache
 from abc import ABC, abstractmethod # pyright: ignore[reportUnusedImport]
 
+try:
+    import ujson as fast_json  # ixtiyoriy - tezroq JSON decoder
+except ImportError:
+    fast_json = json
+
+# Og'ir modullar (prettytable, sqlite3, concurrent.futures, subprocess, shutil,
+# hashlib, secrets) faqat kerak bo'lgan funksiya ichida import qilinadi - CLI tez ishga tushadi.
+
 # ============================================================================
 # KONFIGURATSIYA - MAKSIMAL SAMARADORLIK UCHUN
 # ============================================================================
@@ -79,6 +85,7 @@ class Config:
     BACKUP_DIR: str = "/var/backups/postgresql-ultimate"
     DATA_DIR: str = "/var/lib/postgresql-ultimate"
     TMP_DIR: str = "/tmp/postgresql-ultimate"
+    METRICS_DIR: str = ""
     
     # Fayllar
     LOG_FILE: str = ""
@@ -89,11 +96,23 @@ class Config:
     METRICS_FILE: str = ""
     CACHE_FILE: str = ""
     SETTINGS_FILE: str = ""
+    REGISTRY_DB_FILE: str = ""
+    
+    # Registry: json - database_urls.json/deployments.json, sqlite - REGISTRY_DB_FILE
+    REGISTRY_BACKEND: str = "json"
+    
+    CONFIG_FLUSH_DELAY: float = 0.5  # sekund - ketma-ket o'zgarishlar bitta yozuvga yig'iladi
     
     # Monitoring sozlamalari
     MONITOR_INTERVAL: int = 2  # sekund
     METRICS_RETENTION_DAYS: int = 30
+    METRICS_HISTORY_CAPACITY: int = 0  # 0 - retention / interval dan hisoblanadi
+    TIMESERIES_FSYNC_INTERVAL: float = 5.0  # sekund
+    METRICS_LOG_MAX_ENTRIES: int = 1000  # har bir deployment uchun
+    METRICS_LOG_FLUSH_SIZE: int = 50
+    METRICS_LOG_FLUSH_INTERVAL: float = 5.0  # sekund
     SLOW_QUERY_THRESHOLD: float = 0.5  # sekund
+    ALERT_SLOW_QUERY_SECONDS: float = 5.0  # shundan uzun querylar alert beradi
     ALERT_THRESHOLD_CONNECTIONS: int = 80
     ALERT_THRESHOLD_CPU: int = 70
     ALERT_THRESHOLD_MEMORY: int = 80
@@ -119,8 +138,15 @@ class Config:
     # Performance
     CACHE_ENABLED: bool = True
     CACHE_TTL: int = 300
+    CACHE_MAX_ENTRIES: int = 1024  # result_cache dagi yozuvlar soni (LRU)
     PARALLEL_WORKERS: int = 4
     BATCH_SIZE: int = 1000
+    COPY_BATCH_SIZE: int = 10000
+    STREAM_ITERSIZE: int = 2000
+    PREPARED_STATEMENTS_ENABLED: bool = True
+    PREPARED_CACHE_SIZE: int = 100  # har bir connection uchun
+    PREPARED_THRESHOLD: int = 2  # nechanchi bajarilishda PREPARE qilinadi
+    BULK_INSERT_METHOD: str = "copy"  # copy | values | executemany
     COMPRESSION_LEVEL: int = 6
     
     # Features
@@ -130,6 +156,18 @@ class Config:
     AUTO_CLEANUP_DAYS: int = 7
     TELEMETRY_ENABLED: bool = False
     
+    # Daemon (systemd service)
+    DAEMON_WORKERS: int = 4
+    DAEMON_DRAIN_TIMEOUT: int = 30  # SIGTERM dan keyin ishlarni tugatish uchun, sekund
+    DAEMON_RELOAD_INTERVAL: int = 60  # deployment lar ro'yxatini qayta o'qish
+    DAEMON_MAX_BACKOFF: int = 300  # xatodan keyin maksimal kutish, sekund
+    DAEMON_BACKUP_RETRY: int = 300  # backup xatosidan keyingi birinchi kutish (AUTO_BACKUP_INTERVAL gacha ikkilanadi)
+    
+    # Async poller (ko'p deployment monitoringi)
+    POLLER_CONCURRENCY: int = 20  # bir vaqtda bajariladigan so'rovlar
+    POLLER_TIMEOUT: float = 10.0  # bitta namuna uchun, sekund
+    POLLER_IDLE_DISCONNECT: int = 60  # interval bundan katta bo'lsa ulanish namunalar orasida yopiladi
+    
     def __post_init__(self):
         """Dinamik sozlamalarni initializatsiya qilish"""
         timestamp = datetime.datetime.now().strftime('%Y%m%d')
@@ -141,11 +179,19 @@ class Config:
         self.METRICS_FILE = f"{self.CONFIG_DIR}/metrics.json"
         self.CACHE_FILE = f"{self.CONFIG_DIR}/cache.pickle"
         self.SETTINGS_FILE = f"{self.CONFIG_DIR}/settings.json"
-        
-        # Papkalarni yaratish
+        self.REGISTRY_DB_FILE = f"{self.CONFIG_DIR}/registry.db"
+        self.METRICS_DIR = f"{self.DATA_DIR}/metrics"
+    
+    _dirs_ready = False
+    
+    def ensure_dirs(self):
+        """Papkalarni yaratish - birinchi yozishdan oldin, bir marta"""
+        if self._dirs_ready:
+            return
         for dir_path in [self.LOG_DIR, self.CONFIG_DIR, self.BACKUP_DIR, 
-                         self.DATA_DIR, self.TMP_DIR]:
+                         self.DATA_DIR, self.TMP_DIR, self.METRICS_DIR]:
             os.makedirs(dir_path, mode=0o750, exist_ok=True)
+        self._dirs_ready = True
 
 config = Config()
 
@@ -242,19 +288,211 @@ def perf_monitor(func):
         return result
     return wrapper
 
-def cache_result(ttl: int = 300):
-    """Natijalarni kesh qilish dekoratori"""
+class _Flight:
+    """Bajarilayotgan hisoblash - bir xil kalitni kutayotganlar natijani bo'lishadi"""
+    __slots__ = ('event', 'value', 'error', 'stale', 'versions')
+    
+    def __init__(self, versions: tuple):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False
+        self.versions = versions
+
+class ResultCache:
+    """Thread-safe LRU + TTL kesh
+    
+    Kalit: (namespace, funksiya nomi, argumentlar). Namespace - (cluster, database, user),
+    invalidate(cluster) shu cluster dagi barcha namespace larni tozalaydi. Bir xil
+    kalit uchun bir vaqtdagi miss lar bitta hisoblashga birlashtiriladi (single-flight);
+    hisoblash paytida invalidate bo'lsa eskirgan natija keshga yozilmaydi.
+    
+    Yozuvlar teglarga bog'lanishi mumkin ('databases', 'roles', 'privileges'):
+    yozuv teglarning o'sha paytdagi versiyasini saqlaydi, bump(cluster, tag) versiyani
+    oshiradi - eski yozuvlar keyingi murojaatda skanersiz eskirgan hisoblanadi.
+    """
+    
+    def __init__(self, max_entries: int = None, default_ttl: float = None):
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES
+        self.default_ttl = default_ttl or config.CACHE_TTL
+        self._entries: collections.OrderedDict = collections.OrderedDict()  # key -> (expires, value, versions)
+        self._inflight: Dict[tuple, _Flight] = {}
+        self._tag_versions: Dict[Tuple[str, str], int] = collections.defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.waits = 0
+        self.evictions = self.expirations = self.invalidations = self.bumps = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _cluster(key: tuple) -> str:
+        namespace = key[0]
+        return namespace[0] if isinstance(namespace, tuple) else namespace
+    
+    def _versions(self, cluster: str, tags: Sequence[str]) -> tuple:
+        return tuple(self._tag_versions[(cluster, tag)] for tag in tags)
+    
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any], ttl: float = None,
+                       tags: Sequence[str] = ()) -> Any:
+        """Keshdan olish yoki compute() ni bajarish (kalit bo'yicha bittadan)"""
+        with self._lock:
+            versions = self._versions(self._cluster(key), tags)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value, entry_versions = entry
+                if entry_versions != versions:
+                    del self._entries[key]
+                    self.invalidations += 1
+                elif expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                else:
+                    del self._entries[key]
+                    self.expirations += 1
+            
+            # Teg bump dan oldin boshlangan hisoblashga qo'shilinmaydi
+            flight = self._inflight.get(key)
+            leader = flight is None or flight.versions != versions
+            if leader:
+                flight = self._inflight[key] = _Flight(versions)
+                self.misses += 1
+            else:
+                self.waits += 1
+        
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                if not flight.stale and self._versions(self._cluster(key), tags) == flight.versions:
+                    self._entries[key] = (time.monotonic() + (ttl or self.default_ttl),
+                                          flight.value, flight.versions)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            return flight.value
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.event.set()
+    
+    def invalidate(self, cluster: str = None, name: str = None) -> int:
+        """Yozuvlarni o'chirish: cluster (None - hammasi) va/yoki funksiya nomi bo'yicha"""
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (cluster is None or self._cluster(key) == cluster)
+                    and (name is None or key[1] == name)]
+            for key in keys:
+                del self._entries[key]
+            
+            # Hisoblanayotgan natijalar ham eskirgan - keshga yozilmaydi
+            for key in [key for key in self._inflight
+                        if (cluster is None or self._cluster(key) == cluster)
+                        and (name is None or key[1] == name)]:
+                self._inflight.pop(key).stale = True
+            
+            self.invalidations += len(keys)
+            return len(keys)
+    
+    def bump(self, cluster: str, *tags: str):
+        """Teglar versiyasini oshirish - shu teglarga bog'langan yozuvlar eskiradi"""
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[(cluster, tag)] += 1
+            self.bumps += len(tags)
+    
+    def clear(self):
+        self.invalidate()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Kesh statistikasi"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.waits,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'tag_bumps': self.bumps,
+                'hit_rate': (self.hits + self.waits) / lookups * 100 if lookups else 0.0
+            }
+
+result_cache = ResultCache()
+
+def _cache_key(value: Any) -> Any:
+    """Argumentlarni hashlanadigan kalitga aylantirish"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_cache_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _cache_key(v)) for k, v in value.items()))
+    if isinstance(value, Enum):
+        return value.value
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+CACHE_TAGS = ('databases', 'roles', 'privileges')
+
+def _check_tags(tags: Sequence[str]):
+    unknown = set(tags) - set(CACHE_TAGS)
+    if unknown:
+        raise ValueError(f"Unknown cache tags: {', '.join(sorted(unknown))}")
+
+def cache_result(ttl: int = None, tags: Sequence[str] = ()):
+    """Metod natijasini umumiy result_cache da saqlash
+    
+    Namespace - self.cache_namespace (bo'lmasa obyektning o'zi), shuning uchun
+    bitta deployment ga ulangan managerlar keshni bo'lishadi. tags - natija
+    bog'liq katalog qismlari; invalidates_cache ularni bump qiladi.
+    ttl berilmasa config.CACHE_TTL.
+    """
+    _check_tags(tags)
+    
     def decorator(func):
-        cache = {}
+        name = func.__qualname__
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            key = str(args) + str(kwargs)
-            now = time.time()
-            if key in cache and now - cache[key]['time'] < ttl:
-                return cache[key]['result']
-            result = func(*args, **kwargs)
-            cache[key] = {'result': result, 'time': now}
-            return result
+        def wrapper(self, *args, **kwargs):
+            if not config.CACHE_ENABLED:
+                return func(self, *args, **kwargs)
+            namespace = getattr(self, 'cache_namespace', None) or f"object:{id(self)}"
+            key = (namespace, name, _cache_key(args), _cache_key(kwargs))
+            return result_cache.get_or_compute(key, lambda: func(self, *args, **kwargs),
+                                               ttl or config.CACHE_TTL, tags)
+        return wrapper
+    return decorator
+
+def invalidates_cache(*tags: str):
+    """O'zgartiruvchi metod - bajarilgandan (commit dan) keyin teglar bump qilinadi
+    
+    Teg berilmasa cluster keshi to'liq tozalanadi.
+    """
+    _check_tags(tags)
+    
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self.invalidate_cache(*tags)
         return wrapper
     return decorator
 
@@ -274,14 +512,26 @@ def retry_on_failure(max_attempts: int = 3, delay: float = 0.5):
         return wrapper
     return decorator
 
+_executors: Dict[int, Any] = {}
+_executors_lock = threading.Lock()
+
+def _shared_executor(max_workers: int):
+    """max_workers bo'yicha umumiy ThreadPoolExecutor - birinchi chaqiruvda yaratiladi"""
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            import concurrent.futures
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                             thread_name_prefix='pgu-async')
+            _executors[max_workers] = executor
+        return executor
+
 def async_executor(max_workers: int = 4):
-    """Asinxron bajarish"""
+    """Asinxron bajarish - umumiy thread pool da, darhol Future qaytaradi"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future = executor.submit(func, *args, **kwargs)
-                return future
+            return _shared_executor(max_workers).submit(func, *args, **kwargs)
         return wrapper
     return decorator
 
@@ -293,6 +543,7 @@ class UltimateLogger:
     """Professional logging tizimi - 99.99% reliability"""
     
     _instance = None
+    _setup_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -302,8 +553,19 @@ class UltimateLogger:
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self.initialized = True
-            self.setup_logging()
-            self.setup_rotation()
+            self._logger: Optional[logging.Logger] = None
+            self._console_level = logging.INFO
+    
+    @property
+    def logger(self) -> logging.Logger:
+        """Birinchi yozuvda sozlanadi - import paytida log fayl ochilmaydi"""
+        if self._logger is None:
+            with self._setup_lock:
+                if self._logger is None:
+                    config.ensure_dirs()
+                    self.setup_rotation()
+                    self.setup_logging()
+        return self._logger
     
     def setup_logging(self):
         """Logging sozlamalari"""
@@ -320,22 +582,36 @@ class UltimateLogger:
         # Console handler
         ch = logging.StreamHandler()
         ch.setFormatter(formatter)
-        ch.setLevel(logging.INFO)
-        
-        # Logger
-        self.logger = logging.getLogger('PostgreSQL_Ultimate')
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
+        ch.setLevel(self._console_level)
+        
+        # Logger (qayta sozlanganda eski handler lar yopiladi)
+        log = logging.getLogger('PostgreSQL_Ultimate')
+        for handler in list(log.handlers):
+            log.removeHandler(handler)
+            handler.close()
+        log.setLevel(logging.DEBUG)
+        log.addHandler(fh)
+        log.addHandler(ch)
+        self._logger = log
+    
+    def set_console_level(self, level: int):
+        """Konsolga chiqadigan minimal daraja (fayl logi o'zgarmaydi)"""
+        self._console_level = level
+        if self._logger is not None:
+            for handler in self._logger.handlers:
+                if not isinstance(handler, logging.FileHandler):
+                    handler.setLevel(level)
     
     def setup_rotation(self):
         """Log rotation"""
         if os.path.exists(config.LOG_FILE):
             if os.path.getsize(config.LOG_FILE) > 100 * 1024 * 1024:  # 100MB
+                import shutil
                 timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
                 rotated = f"{config.LOG_FILE}.{timestamp}"
                 shutil.move(config.LOG_FILE, rotated)
-                self.setup_logging()
+                if self._logger is not None:
+                    self.setup_logging()
     
     def debug(self, message):
         self.logger.debug(f"{Fore.CYAN}🔍 {message}{Style.RESET_ALL}")
@@ -468,6 +744,627 @@ class DatabaseURL:
             'description': self.description
         }
 
+# ============================================================================
+# PERSISTENCE - ATOMIC JSON STORE
+# ============================================================================
+
+class JsonFileStore:
+    """Kalit-qiymat JSON fayl - atomik yozish, yozuvlarni birlashtirish, incremental reload
+    
+    O'zgarishlar xotirada belgilanadi va CONFIG_FLUSH_DELAY dan keyin (yoki batch()
+    tugaganda) bitta yozuv bilan saqlanadi. Yozish tmp fayl + fsync + os.replace
+    orqali, fcntl lock ostida; fayl boshqa jarayon tomonidan o'zgargan bo'lsa,
+    faqat o'zgargan kalitlar uning ustiga qo'yiladi.
+    """
+    
+    def __init__(self, path: str, delay: float = None):
+        self.path = path
+        self.delay = config.CONFIG_FLUSH_DELAY if delay is None else delay
+        self._data: Dict[str, Any] = {}
+        self._dirty: set = set()
+        self._deleted: set = set()
+        self._external_changes: Tuple[set, set] = (set(), set())
+        self._signature = None
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._batch_depth = 0
+        atexit.register(self.flush)
+    
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def _read(self) -> Dict[str, Any]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def load(self) -> Dict[str, Any]:
+        """Faylni to'liq o'qish"""
+        with self._lock:
+            self._signature = self._stat()
+            self._data = self._read() if self._signature else {}
+            self._dirty.clear()
+            self._deleted.clear()
+            return dict(self._data)
+    
+    def _merge_external(self, disk: Dict[str, Any]):
+        """Diskdagi o'zgarishlarni lokal o'zgartirilmagan kalitlarga qo'llash"""
+        changed, removed = self._external_changes
+        for key, value in disk.items():
+            if key in self._dirty or key in self._deleted:
+                continue
+            if key not in self._data or self._data[key] != value:
+                self._data[key] = value
+                changed.add(key)
+                removed.discard(key)
+        
+        for key in list(self._data):
+            if key not in disk and key not in self._dirty:
+                del self._data[key]
+                removed.add(key)
+                changed.discard(key)
+    
+    def reload(self) -> Tuple[set, set]:
+        """Fayl o'zgargan bo'lsa qayta o'qish - (o'zgargan, o'chirilgan) kalitlar"""
+        with self._lock:
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                self._merge_external(self._read() if signature else {})
+            
+            changes = self._external_changes
+            self._external_changes = (set(), set())
+            return changes
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+    
+    def set(self, key: str, value: Any):
+        """Qiymatni yozish (kechiktirilgan flush)"""
+        with self._lock:
+            self._data[key] = value
+            self._dirty.add(key)
+            self._deleted.discard(key)
+            self._schedule()
+    
+    def delete(self, key: str):
+        """Kalitni o'chirish (kechiktirilgan flush)"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._dirty.discard(key)
+            self._deleted.add(key)
+            self._schedule()
+    
+    def _schedule(self):
+        if self._batch_depth or self._timer is not None:
+            return
+        if self.delay <= 0:
+            self.flush()
+            return
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    @contextmanager
+    def batch(self):
+        """Blok ichidagi barcha o'zgarishlar bitta yozuvda saqlanadi"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+    
+    @contextmanager
+    def _file_lock(self):
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def flush(self):
+        """Belgilangan o'zgarishlarni atomik yozish"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty and not self._deleted:
+                return
+            
+            config.ensure_dirs()
+            with self._file_lock():
+                signature = self._stat()
+                if signature != self._signature:
+                    # Boshqa jarayon yozgan - ularning o'zgarishlarini saqlab qolamiz
+                    self._merge_external(self._read() if signature else {})
+                
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                
+                dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+                
+                self._signature = self._stat()
+            
+            count = len(self._dirty) + len(self._deleted)
+            self._dirty.clear()
+            self._deleted.clear()
+            logger.debug(f"💾 Saved {count} changes to {self.path}")
+
+# ============================================================================
+# REGISTRY - SQLITE BACKEND
+# ============================================================================
+
+class SQLiteRegistry:
+    """URL, deployment va alert lar uchun indekslangan SQLite registry
+    
+    Har bir yozuv to'liq JSON (data) ko'rinishida saqlanadi, qidiruv uchun
+    kerakli maydonlar esa alohida indekslangan ustunlarda.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS urls (
+            name TEXT PRIMARY KEY,
+            host TEXT,
+            database TEXT,
+            search TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS urls_host_idx ON urls (host);
+        CREATE TABLE IF NOT EXISTS url_tags (
+            tag TEXT NOT NULL,
+            name TEXT NOT NULL REFERENCES urls (name) ON DELETE CASCADE,
+            PRIMARY KEY (tag, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS url_tags_name_idx ON url_tags (name);
+        CREATE TABLE IF NOT EXISTS deployments (
+            name TEXT PRIMARY KEY,
+            environment TEXT,
+            url_name TEXT,
+            status TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS deployments_environment_idx ON deployments (environment);
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deployment TEXT,
+            timestamp REAL NOT NULL,
+            level TEXT,
+            type TEXT,
+            message TEXT,
+            value REAL,
+            threshold REAL
+        );
+        CREATE INDEX IF NOT EXISTS alerts_deployment_idx ON alerts (deployment, timestamp);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    
+    # Jadval -> data dan tashqari indekslangan ustunlar
+    COLUMNS = {
+        'urls': ('host', 'database', 'search'),
+        'deployments': ('environment', 'url_name', 'status'),
+    }
+    
+    def __init__(self, path: str = None):
+        import sqlite3
+        
+        self.path = path or config.REGISTRY_DB_FILE
+        self._lock = threading.RLock()
+        self._depth = 0
+        config.ensure_dirs()
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(self.SCHEMA)
+    
+    @contextmanager
+    def transaction(self):
+        """Bitta tranzaksiya (ichma-ich chaqirish mumkin)"""
+        with self._lock:
+            if not self._depth:
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except Exception:
+                self._depth -= 1
+                if not self._depth:
+                    self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    self.conn.execute("COMMIT")
+    
+    def _query(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def get(self, table: str, name: str) -> Optional[Dict[str, Any]]:
+        """Yozuvni nomi bo'yicha olish (PRIMARY KEY)"""
+        rows = self._query(f"SELECT data FROM {table} WHERE name = ?", (name,))
+        return json.loads(rows[0][0]) if rows else None
+    
+    def contains(self, table: str, name: str) -> bool:
+        return bool(self._query(f"SELECT 1 FROM {table} WHERE name = ?", (name,)))
+    
+    def names(self, table: str) -> List[str]:
+        return [row[0] for row in self._query(f"SELECT name FROM {table} ORDER BY name")]
+    
+    def count(self, table: str) -> int:
+        return self._query(f"SELECT count(*) FROM {table}")[0][0]
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+    
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                              "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value))
+    
+    def put(self, table: str, name: str, data: Dict[str, Any], tags: Sequence[str] = None, **columns):
+        """Yozuvni saqlash (upsert)"""
+        if table == 'urls':
+            # Matnli qidiruv uchun bitta ustun: nom, host, database, tag lar
+            columns['search'] = '\n'.join(
+                filter(None, [name, columns.get('host'), columns.get('database')] + list(tags or []))
+            ).lower()
+        
+        names = ('name',) + self.COLUMNS[table] + ('data',)
+        values = [name] + [columns.get(column) for column in self.COLUMNS[table]]
+        values.append(json.dumps(data, ensure_ascii=False, default=str))
+        updates = ', '.join(f"{column} = excluded.{column}" for column in names[1:])
+        
+        with self.transaction():
+            self.conn.execute(
+                f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+                f"ON CONFLICT (name) DO UPDATE SET {updates}",
+                values
+            )
+            if tags is not None:
+                self.conn.execute("DELETE FROM url_tags WHERE name = ?", (name,))
+                self.conn.executemany("INSERT OR IGNORE INTO url_tags (tag, name) VALUES (?, ?)",
+                                      [(tag.lower(), name) for tag in tags])
+    
+    def delete(self, table: str, name: str) -> bool:
+        with self._lock:
+            return self.conn.execute(f"DELETE FROM {table} WHERE name = ?", (name,)).rowcount > 0
+    
+    def search_urls(self, query: str = None, hosts: Sequence[str] = (),
+                    tags: Sequence[Sequence[str]] = ()) -> List[Tuple[str, Dict[str, Any]]]:
+        """URL larni qidirish - host qism-satr, tag indeks orqali, matn LIKE orqali
+        
+        tags - guruhlar ro'yxati: har bir guruhdan kamida bitta tag bo'lishi kerak.
+        """
+        def like(value: str) -> str:
+            return '%' + value.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        
+        conditions, params = [], []
+        for host in hosts:
+            conditions.append("lower(u.host) LIKE ? ESCAPE '\\'")
+            params.append(like(host))
+        for group in tags:
+            group = [tag.lower() for tag in group]
+            if not group:
+                return []
+            conditions.append(f"u.name IN (SELECT name FROM url_tags WHERE tag IN ({', '.join('?' * len(group))}))")
+            params.extend(group)
+        if query:
+            conditions.append("u.search LIKE ? ESCAPE '\\'")
+            params.append(like(query))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._query(f"SELECT u.name, u.data FROM urls u {where} ORDER BY u.name", params)
+        return [(name, json.loads(data)) for name, data in rows]
+    
+    def deployments_by_environment(self, environment: str) -> List[Dict[str, Any]]:
+        rows = self._query("SELECT data FROM deployments WHERE environment = ? ORDER BY name", (environment,))
+        return [json.loads(row[0]) for row in rows]
+    
+    def add_alerts(self, deployment: Optional[str], alerts: List[Dict[str, Any]]):
+        """Alert larni saqlash"""
+        rows = []
+        for alert in alerts:
+            timestamp = alert['timestamp']
+            level = alert['level']
+            rows.append((
+                deployment,
+                timestamp.timestamp() if isinstance(timestamp, datetime.datetime) else timestamp,
+                level.name if isinstance(level, Enum) else level,
+                alert['type'], alert['message'], alert.get('value'), alert.get('threshold')
+            ))
+        
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT INTO alerts (deployment, timestamp, level, type, message, value, threshold) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+    
+    def recent_alerts(self, deployment: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oxirgi alert lar"""
+        sql = "SELECT deployment, timestamp, level, type, message, value, threshold FROM alerts"
+        params: List[Any] = []
+        if deployment is not None:
+            sql += " WHERE deployment = ?"
+            params.append(deployment)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        
+        keys = ('deployment', 'timestamp', 'level', 'type', 'message', 'value', 'threshold')
+        alerts = [dict(zip(keys, row)) for row in self._query(sql, params)]
+        for alert in alerts:
+            alert['timestamp'] = datetime.datetime.fromtimestamp(alert['timestamp'])
+        return alerts
+    
+    def migrate_from_json(self, urls_file: str = None, deployments_file: str = None) -> Tuple[int, int]:
+        """database_urls.json va deployments.json dan ko'chirish"""
+        urls_file = urls_file or config.DATABASE_URLS_FILE
+        deployments_file = deployments_file or config.DEPLOYMENTS_FILE
+        url_count = deployment_count = 0
+        
+        with self.transaction():
+            if os.path.exists(urls_file):
+                with open(urls_file, 'r', encoding='utf-8') as f:
+                    for name, data in json.load(f).items():
+                        url = DatabaseURL.from_string(data['url'])
+                        self.put('urls', name, data, tags=data.get('tags', []),
+                                 host=url.host, database=url.database)
+                        url_count += 1
+            
+            if os.path.exists(deployments_file):
+                with open(deployments_file, 'r', encoding='utf-8') as f:
+                    for name, data in json.load(f).items():
+                        # Eski formatdagi metrikalar alohida logga
+                        entries = data.pop('metrics', None)
+                        if entries:
+                            MetricsLog.for_deployment(name).extend(entries)
+                        self.put('deployments', name, data, environment=data.get('environment'),
+                                 url_name=data.get('url_name'), status=data.get('status'))
+                        deployment_count += 1
+            
+            self.set_meta('json_migrated', datetime.datetime.now().isoformat())
+        
+        logger.success(f"📦 Migrated {url_count} URLs and {deployment_count} deployments to {self.path}")
+        return url_count, deployment_count
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+class RegistryView(MutableMapping):
+    """Registry jadvalining lazy dict ko'rinishi - yozuvlar talab qilinganda o'qiladi"""
+    
+    def __init__(self, registry: SQLiteRegistry, table: str,
+                 load: Callable[[Dict[str, Any]], Any],
+                 dump: Callable[[Any], Tuple[Dict[str, Any], Dict[str, Any]]]):
+        self.registry = registry
+        self.table = table
+        self._load = load
+        self._dump = dump
+    
+    def __getitem__(self, name: str) -> Any:
+        data = self.registry.get(self.table, name)
+        if data is None:
+            raise KeyError(name)
+        return self._load(data)
+    
+    def __setitem__(self, name: str, value: Any):
+        data, columns = self._dump(value)
+        self.registry.put(self.table, name, data, **columns)
+    
+    def __delitem__(self, name: str):
+        if not self.registry.delete(self.table, name):
+            raise KeyError(name)
+    
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.registry.contains(self.table, name)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.names(self.table))
+    
+    def __len__(self) -> int:
+        return self.registry.count(self.table)
+
+_registry: Optional[SQLiteRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> SQLiteRegistry:
+    """Umumiy SQLite registry (birinchi ochilishda JSON fayllardan ko'chiriladi)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            registry = SQLiteRegistry()
+            # Ko'chirish bir marta - keyin hamma yozuv o'chirilsa ham eski JSON qayta o'qilmaydi
+            if registry.get_meta('json_migrated') is None:
+                if (not registry.count('urls') and not registry.count('deployments')
+                        and (os.path.exists(config.DATABASE_URLS_FILE)
+                             or os.path.exists(config.DEPLOYMENTS_FILE))):
+                    registry.migrate_from_json()
+                else:
+                    registry.set_meta('json_migrated', datetime.datetime.now().isoformat())
+            _registry = registry
+        return _registry
+
+# ============================================================================
+# URL SEARCH INDEX - TRIGRAM
+# ============================================================================
+
+# Tag -> muhit (EnvironmentType nomi); env: filtri va tag lar shu orqali moslanadi
+ENV_TAG_ALIASES = {env.name.lower(): env.name.lower() for env in EnvironmentType}
+ENV_TAG_ALIASES.update({
+    'dev': 'development', 'test': 'testing', 'qa': 'testing', 'stage': 'staging',
+    'prod': 'production', 'prd': 'production', 'dr': 'disaster_recovery'
+})
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class URLSearchIndex:
+    """URL lar uchun trigram inverted index - incremental yangilanadi
+    
+    Qidiruv so'rovi: erkin matn va tag:/env:/host: filtrlari, masalan
+    "billing env:prod tag:eu". Natijalar mosligi bo'yicha saralanadi.
+    """
+    
+    FUZZY_THRESHOLD = 0.5  # so'rov trigramlarining kamida shuncha qismi mos bo'lishi kerak
+    
+    def __init__(self):
+        self._fields: Dict[str, Tuple[str, ...]] = {}
+        self._text: Dict[str, str] = {}
+        self._grams: Dict[str, set] = collections.defaultdict(set)
+        self._hosts: Dict[str, set] = collections.defaultdict(set)
+        self._tags: Dict[str, set] = collections.defaultdict(set)
+        self._envs: Dict[str, set] = collections.defaultdict(set)
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    @staticmethod
+    def _unlink(postings: Dict[str, set], key: str, name: str):
+        bucket = postings.get(key)
+        if bucket is not None:
+            bucket.discard(name)
+            if not bucket:
+                del postings[key]
+    
+    def add(self, name: str, url: DatabaseURL):
+        """URL ni indekslash (mavjud bo'lsa yangilanadi)"""
+        if name in self._fields:
+            self.remove(name)
+        
+        host = (url.host or '').lower()
+        tags = [tag.lower() for tag in url.tags]
+        fields = (name.lower(), host, (url.database or '').lower(), *tags)
+        self._fields[name] = fields
+        self._text[name] = '\n'.join(fields)
+        
+        for value in fields:
+            for gram in _trigrams(value):
+                self._grams[gram].add(name)
+        self._hosts[host].add(name)
+        for tag in tags:
+            self._tags[tag].add(name)
+            env = ENV_TAG_ALIASES.get(tag)
+            if env:
+                self._envs[env].add(name)
+    
+    def remove(self, name: str):
+        """URL ni indeksdan olib tashlash"""
+        fields = self._fields.pop(name, None)
+        if fields is None:
+            return
+        del self._text[name]
+        
+        for value in fields:
+            for gram in _trigrams(value):
+                self._unlink(self._grams, gram, name)
+        self._unlink(self._hosts, fields[1], name)
+        for tag in fields[3:]:
+            self._unlink(self._tags, tag, name)
+            env = ENV_TAG_ALIASES.get(tag)
+            if env:
+                self._unlink(self._envs, env, name)
+    
+    @staticmethod
+    def parse_query(query: str) -> Tuple[str, Dict[str, List[str]]]:
+        """Erkin matn va filtrlarni ajratish"""
+        filters: Dict[str, List[str]] = {'tag': [], 'env': [], 'host': []}
+        words = []
+        for word in query.lower().split():
+            key, sep, value = word.partition(':')
+            if sep and key in filters and value:
+                filters[key].append(value)
+            else:
+                words.append(word)
+        return ' '.join(words), filters
+    
+    def _filter(self, filters: Dict[str, List[str]]) -> List[set]:
+        """Filtrlarga mos nomlar to'plamlari - kichigidan kattasiga"""
+        sets = []
+        for tag in filters['tag']:
+            sets.append(self._tags.get(tag, set()))
+        for env in filters['env']:
+            sets.append(self._envs.get(ENV_TAG_ALIASES.get(env, env), set()))
+        for host in filters['host']:
+            # host: har doim qism-satr bo'yicha (db1 -> db1, db1.eu, ...)
+            sets.append(set().union(*(names for key, names in self._hosts.items() if host in key)))
+        
+        sets.sort(key=len)
+        return sets
+    
+    def _score(self, name: str, text: str) -> float:
+        """Aniq moslik uchun ball: to'liq nom > nom boshi > nom ichida > boshqa maydon"""
+        own = self._fields[name][0]
+        if own == text:
+            return 4.0
+        if own.startswith(text):
+            return 3.0
+        if text in own:
+            return 2.0
+        return 1.0
+    
+    def search(self, query: str, limit: int = None) -> List[Tuple[str, float]]:
+        """Saralangan (nom, ball) ro'yxati"""
+        text, filters = self.parse_query(query)
+        filter_sets = self._filter(filters)
+        
+        def matches_filters(name: str) -> bool:
+            return all(name in names for names in filter_sets)
+        
+        grams = _trigrams(text)
+        if not text:
+            names = filter_sets[0].intersection(*filter_sets[1:]) if filter_sets else self._fields
+            results = [(name, 1.0) for name in names]
+        elif not grams:
+            # 3 belgidan qisqa - chiziqli qidiruv (filtrlar bo'lsa, faqat ular ichida)
+            pool = filter_sets[0] if filter_sets else self._text
+            results = [(name, self._score(name, text)) for name in pool
+                       if text in self._text[name] and matches_filters(name)]
+        else:
+            postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+            exact = postings[0].intersection(*postings[1:]) if postings[0] else set()
+            results = [(name, self._score(name, text)) for name in exact
+                       if text in self._text[name] and matches_filters(name)]
+            
+            if not results:
+                # Fuzzy: trigramlarning kamida FUZZY_THRESHOLD qismi mos kelganlar.
+                # Bunday nom eng kam uchraydigan (n - minimum + 1) trigramdan kamida bittasida bo'ladi
+                minimum = max(1, int(len(grams) * self.FUZZY_THRESHOLD + 0.5))
+                rare, common = postings[:len(grams) - minimum + 1], postings[len(grams) - minimum + 1:]
+                counts = collections.Counter()
+                for posting in rare:
+                    counts.update(posting)
+                results = []
+                for name, hits in counts.items():
+                    hits += sum(1 for posting in common if name in posting)
+                    if hits >= minimum and matches_filters(name):
+                        results.append((name, hits / len(grams)))
+        
+        key = lambda item: (-item[1], item[0])
+        if limit:
+            return heapq.nsmallest(limit, results, key=key)
+        return sorted(results, key=key)
+
 # ============================================================================
 # DATABASE URL MANAGER - WITH CACHE
 # ============================================================================
@@ -478,47 +1375,94 @@ class DatabaseURLManager:
     def __init__(self):
         self.urls: Dict[str, DatabaseURL] = {}
         self.cache: Dict[str, Any] = {}
-        self.load_urls()
+        self.store: Optional[JsonFileStore] = None
+        self.registry: Optional[SQLiteRegistry] = None
+        self._index: Optional[URLSearchIndex] = None
+        
+        if config.REGISTRY_BACKEND == 'sqlite':
+            self.registry = get_registry()
+            self.urls = RegistryView(self.registry, 'urls', self._deserialize, self._dump)
+        else:
+            self.store = JsonFileStore(config.DATABASE_URLS_FILE)
+            self.load_urls()
+    
+    @staticmethod
+    def _deserialize(url_data: Dict[str, Any]) -> DatabaseURL:
+        url = DatabaseURL.from_string(url_data['url'])
+        url.tags = url_data.get('tags', [])
+        url.description = url_data.get('description', '')
+        url.created_at = datetime.datetime.fromisoformat(url_data.get('created_at', datetime.datetime.now().isoformat()))
+        url.updated_at = datetime.datetime.fromisoformat(url_data.get('updated_at', datetime.datetime.now().isoformat()))
+        return url
+    
+    @staticmethod
+    def _serialize(url: DatabaseURL) -> Dict[str, Any]:
+        return {
+            'url': url.to_string(),
+            'tags': url.tags,
+            'description': url.description,
+            'created_at': url.created_at.isoformat(),
+            'updated_at': url.updated_at.isoformat()
+        }
+    
+    @classmethod
+    def _dump(cls, url: DatabaseURL) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Registry uchun: data va indekslangan ustunlar"""
+        return cls._serialize(url), {'host': url.host, 'database': url.database, 'tags': url.tags}
+    
+    def _save(self, name: str, url: DatabaseURL):
+        self.urls[name] = url
+        if self.store:
+            self.store.set(name, self._serialize(url))
+        if self._index is not None:
+            self._index.add(name, url)
     
     @perf_monitor
     def load_urls(self):
         """URL larni yuklash"""
-        if os.path.exists(config.DATABASE_URLS_FILE):
-            try:
-                with open(config.DATABASE_URLS_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for name, url_data in data.items():
-                        url = DatabaseURL.from_string(url_data['url'])
-                        url.tags = url_data.get('tags', [])
-                        url.description = url_data.get('description', '')
-                        url.created_at = datetime.datetime.fromisoformat(url_data.get('created_at', datetime.datetime.now().isoformat()))
-                        url.updated_at = datetime.datetime.fromisoformat(url_data.get('updated_at', datetime.datetime.now().isoformat()))
-                        self.urls[name] = url
+        try:
+            data = self.store.load()
+            self.urls = {name: self._deserialize(url_data) for name, url_data in data.items()}
+            self._index = None
+            if data:
                 logger.success(f"📂 Loaded {len(self.urls)} database URLs")
-            except Exception as e:
-                logger.error(f"Failed to load URLs: {e}")
+        except Exception as e:
+            logger.error(f"Failed to load URLs: {e}")
+    
+    def refresh(self):
+        """Boshqa jarayon yozgan o'zgarishlarni olish (faqat o'zgargan kalitlar)"""
+        if not self.store:
+            return
+        try:
+            changed, removed = self.store.reload()
+        except Exception as e:
+            logger.error(f"Failed to reload URLs: {e}")
+            return
+        
+        for name in removed:
+            self.urls.pop(name, None)
+            if self._index is not None:
+                self._index.remove(name)
+        for name in changed:
+            url = self.urls[name] = self._deserialize(self.store.get(name))
+            if self._index is not None:
+                self._index.add(name, url)
     
     @perf_monitor
     def save_urls(self):
         """URL larni saqlash"""
         try:
-            data = {}
-            for name, url in self.urls.items():
-                data[name] = {
-                    'url': url.to_string(),
-                    'tags': url.tags,
-                    'description': url.description,
-                    'created_at': url.created_at.isoformat(),
-                    'updated_at': url.updated_at.isoformat()
-                }
-            
-            with open(config.DATABASE_URLS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
+            with self.batch():
+                for name, url in self.urls.items():
+                    self._save(name, url)
             logger.success("💾 Database URLs saved")
         except Exception as e:
             logger.error(f"Failed to save URLs: {e}")
     
+    def batch(self):
+        """Ko'p o'zgarishni bitta yozuvda saqlash: with manager.batch(): ..."""
+        return self.registry.transaction() if self.registry else self.store.batch()
+    
     def add_url(self, name: str, url: DatabaseURL) -> bool:
         """Yangi URL qo'shish"""
         if name in self.urls:
@@ -526,13 +1470,13 @@ class DatabaseURLManager:
             return False
         
         url.updated_at = datetime.datetime.now()
-        self.urls[name] = url
-        self.save_urls()
+        self._save(name, url)
         logger.success(f"✅ Added URL: {name} - {url.to_string(hide_password=True)}")
         return True
     
     def get_url(self, name: str) -> Optional[DatabaseURL]:
         """URL ni nomi bo'yicha olish"""
+        self.refresh()
         return self.urls.get(name)
     
     def remove_url(self, name: str) -> bool:
@@ -542,7 +1486,10 @@ class DatabaseURLManager:
             return False
         
         del self.urls[name]
-        self.save_urls()
+        if self.store:
+            self.store.delete(name)
+        if self._index is not None:
+            self._index.remove(name)
         logger.success(f"🗑️ Removed URL: {name}")
         return True
     
@@ -558,27 +1505,1004 @@ class DatabaseURLManager:
                 setattr(url, key, value)
         
         url.updated_at = datetime.datetime.now()
-        self.save_urls()
+        self._save(name, url)
         logger.success(f"✏️ Updated URL: {name}")
         return True
     
     def list_urls(self) -> List[Tuple[str, DatabaseURL]]:
         """URL lar ro'yxati"""
+        self.refresh()
         return list(self.urls.items())
     
-    def search_urls(self, query: str) -> List[Tuple[str, DatabaseURL]]:
-        """URL larni qidirish"""
-        query = query.lower()
-        results = []
+    @property
+    def search_index(self) -> URLSearchIndex:
+        """Qidiruv indeksi - birinchi qidiruvda quriladi, keyin incremental yangilanadi"""
+        if self._index is None:
+            index = URLSearchIndex()
+            for name, url in self.urls.items():
+                index.add(name, url)
+            self._index = index
+        return self._index
+    
+    def search_urls(self, query: str, limit: int = None) -> List[Tuple[str, DatabaseURL]]:
+        """URL larni qidirish - "matn tag:eu env:prod host:db1" ko'rinishida, moslik bo'yicha saralangan"""
+        if self.registry:
+            # Filtrlar SQL da, saralash va fuzzy esa nomzodlar ustidagi
+            # vaqtinchalik indeksda - natija xotiradagi indeks bilan bir xil
+            text, filters = URLSearchIndex.parse_query(query)
+            tags = [[tag] for tag in filters['tag']]
+            for env in filters['env']:
+                env = ENV_TAG_ALIASES.get(env, env)
+                tags.append([tag for tag, target in ENV_TAG_ALIASES.items() if target == env])
+            
+            # Aniq (qism-satr) moslik bo'lsa fuzzy kerak emas - LIKE nomzodlarni toraytiradi
+            candidates = self.registry.search_urls(text, hosts=filters['host'], tags=tags) if text else []
+            if not candidates and (not text or _trigrams(text)):
+                candidates = self.registry.search_urls(hosts=filters['host'], tags=tags)
+            
+            urls = {name: self._deserialize(data) for name, data in candidates}
+            index = URLSearchIndex()
+            for name, url in urls.items():
+                index.add(name, url)
+            return [(name, urls[name]) for name, _ in index.search(query, limit)]
+        
+        self.refresh()
+        return [(name, self.urls[name]) for name, _ in self.search_index.search(query, limit)]
+
+# ============================================================================
+# BULK INGEST - COPY TEXT FORMAT
+# ============================================================================
+
+BULK_INSERT_METHODS = ('copy', 'values', 'executemany')
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def _copy_value(value: Any) -> str:
+    """Python qiymatini COPY text formatiga o'tkazish"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        # json/jsonb ustunlar uchun
+        return json.dumps(value, ensure_ascii=False, default=str).translate(_COPY_ESCAPES)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '\\\\x' + bytes(value).hex()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+def _copy_row(row: Sequence) -> str:
+    """Bitta qatorni COPY text qatoriga aylantirish"""
+    return '\t'.join([_copy_value(value) for value in row]) + '\n'
+
+def _compile_csv_converter(columns: List[str],
+                           categories: Dict[str, str]) -> Optional[Callable]:
+    """Ustun turlari bo'yicha chunk konverterini bir marta qurish
+    
+    Qiymatlar matn ko'rinishida COPY ga uzatiladi va turga o'tkazishni server
+    bajaradi. Python tomonda faqat matn bo'lmagan ustunlardagi bo'sh qiymat
+    NULL ga aylantiriladi (pg_type.typcategory 'S' - string turlar).
+    """
+    indexes = [i for i, column in enumerate(columns) if categories.get(column, 'S') != 'S']
+    if not indexes:
+        return None
+    
+    def convert(rows: List[List[Any]]) -> List[List[Any]]:
+        for row in rows:
+            for i in indexes:
+                if row[i] == '':
+                    row[i] = None
+        return rows
+    
+    return convert
+
+JSON_SNIFF_SIZE = 4096
+JSON_SNIFF_LINE_LIMIT = 1 << 20  # NDJSON ni aniqlash uchun birinchi qatorning maksimal uzunligi
+
+def _detect_json_format(f, path: str) -> str:
+    """Fayl formatini aniqlash: ndjson, array yoki object
+    
+    Faqat cheklangan prefiks o'qiladi - bitta qatorli (minify qilingan) katta
+    massiv butunlay xotiraga yuklanmaydi.
+    """
+    if path.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    
+    skipped = 0
+    head = ''
+    while True:
+        chunk = f.read(JSON_SNIFF_SIZE)
+        if not chunk:
+            break
+        head = chunk.lstrip()
+        skipped += len(chunk) - len(head)
+        if head:
+            break
+    
+    try:
+        if head.startswith('['):
+            return 'array'
+        if not head.startswith('{'):
+            return 'object'
+        
+        # Birinchi qator qisqa va to'liq obyekt bo'lsa - bu NDJSON
+        f.seek(0)
+        f.read(skipped)
+        first_line = f.readline(JSON_SNIFF_LINE_LIMIT)
+        if len(first_line) >= JSON_SNIFF_LINE_LIMIT and not first_line.endswith('\n'):
+            return 'object'
+        try:
+            fast_json.loads(first_line)
+            return 'ndjson'
+        except ValueError:
+            return 'object'
+    finally:
+        f.seek(0)
+
+def _iter_ndjson_batches(f, batch_size: int) -> Iterator[List[Any]]:
+    """NDJSON qatorlarini batch bo'yicha decode qilish"""
+    line_no = 0
+    lines = []
+    
+    def decode(lines: List[Tuple[int, str]]) -> List[Any]:
+        try:
+            # Butun batch bitta loads chaqiruvida; '{..},{..}' kabi qator bir nechta
+            # element berib qo'ysa soni mos kelmaydi - qatorma-qator tekshiriladi
+            records = fast_json.loads('[' + ','.join(line for _, line in lines) + ']')
+            if len(records) != len(lines):
+                raise ValueError("record count does not match line count")
+            return records
+        except ValueError:
+            records = []
+            for number, line in lines:
+                try:
+                    records.append(fast_json.loads(line))
+                except ValueError as e:
+                    logger.warning(f"Invalid JSON on line {number}: {e}")
+                    records.append(None)
+            return records
+    
+    for line in f:
+        line_no += 1
+        line = line.strip()
+        if not line:
+            continue
+        lines.append((line_no, line))
+        if len(lines) >= batch_size:
+            yield decode(lines)
+            lines = []
+    
+    if lines:
+        yield decode(lines)
+
+def _iter_json_array(f, read_size: int = 1 << 20) -> Iterator[Any]:
+    """Top-level JSON massivni element bo'yicha o'qish (raw_decode bilan)
+    
+    Elementlar orasida aynan bitta ',' bo'lishi kerak - [1 2] yoki [1,,2]
+    kabi noto'g'ri massivlar json.load dagi kabi ValueError beradi.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    # open: '[' kutiladi, first: element yoki ']', value: element, sep: ',' yoki ']'
+    state = 'open'
+    
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+            pos += 1
+        
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        
+        char = buffer[pos]
+        if state == 'open':
+            if char != '[':
+                raise ValueError("Top-level JSON array expected")
+            state = 'first'
+            pos += 1
+            continue
+        
+        if state == 'sep':
+            if char == ',':
+                state = 'value'
+                pos += 1
+                continue
+            if char == ']':
+                break
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+        
+        if char == ']' and state == 'first':
+            break
+        if char in ',]':
+            raise ValueError(f"Expected a value in JSON array, got {char!r}")
+        
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = None
+        
+        # Qiymatdan keyin ',' yoki ']' ko'rinmasa - u kesilgan bo'lishi mumkin
+        # (masalan buffer "-7." da tugagan son)
+        if end is not None and not eof:
+            tail = end
+            while tail < len(buffer) and buffer[tail] in ' \t\r\n':
+                tail += 1
+            if tail >= len(buffer) or buffer[tail] not in ',]':
+                end = None
+        
+        if end is None:
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        
+        yield item
+        pos = end
+        state = 'sep'
+        
+        if pos > read_size:
+            buffer = buffer[pos:]
+            pos = 0
+    
+    # ']' dan keyin faqat bo'shliq bo'lishi mumkin
+    rest = buffer[pos + 1:]
+    while True:
+        if rest.strip(' \t\r\n'):
+            raise ValueError("Extra data after JSON array")
+        if eof:
+            return
+        rest = f.read(read_size)
+        eof = not rest
+
+def _peak_rss_mb() -> float:
+    """Jarayonning eng yuqori RSS xotirasi (MB)"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KB, macOS da bayt
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Iterable ni size o'lchamli list larga bo'lish"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# ============================================================================
+# ROW FORMATS - NATIJA SHAKLLARI
+# ============================================================================
+
+ROW_FORMATS = ('dict', 'tuple', 'record', 'columns')
+
+@lru_cache(maxsize=256)
+def _record_class(columns: Tuple[str, ...]) -> type:
+    """Natija shakli uchun record klassi - har bir ustunlar to'plamiga bir marta quriladi"""
+    return collections.namedtuple('Record', columns, rename=True)
+
+def _shape_rows(columns: Sequence[str], rows: List[tuple], row_format: str) -> Any:
+    """Oddiy tuple qatorlarni tanlangan formatga o'tkazish
+    
+    tuple   - o'zgarishsiz (eng ixcham)
+    record  - namedtuple (__slots__ = (), atribut orqali murojaat)
+    columns - {ustun: [qiymatlar]} ustunli ko'rinish
+    dict    - har bir qator uchun dict
+    """
+    if row_format == 'tuple':
+        return rows
+    if row_format == 'record':
+        return list(map(_record_class(tuple(columns))._make, rows))
+    if row_format == 'columns':
+        if not rows:
+            return {column: [] for column in columns}
+        return dict(zip(columns, map(list, zip(*rows))))
+    if row_format == 'dict':
+        return [dict(zip(columns, row)) for row in rows]
+    raise ValueError(f"Unknown row format: {row_format}")
+
+# ============================================================================
+# PREPARED STATEMENT CACHE
+# ============================================================================
+
+_PLACEHOLDER_RE = re.compile(r'%(%|s|\([^)]*\)s)?')
+_QUOTED_OR_SPACE_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+")
+
+def _normalize_sql(query: str) -> str:
+    """Kesh kaliti uchun SQL - qo'shtirnoqdan tashqaridagi bo'shliqlar bittaga"""
+    return _QUOTED_OR_SPACE_RE.sub(
+        lambda m: ' ' if m.group(0)[0].isspace() else m.group(0), query
+    ).strip()
+
+_CAST_OPEN_RE = re.compile(r'\bcast\s*\(\s*$', re.IGNORECASE)
+_CAST_AS_RE = re.compile(r'\s+as\b', re.IGNORECASE)
+
+def _to_server_placeholders(query: str) -> Tuple[Optional[str], int]:
+    """psycopg2 %s placeholder larini $1..$n ga o'girish
+    
+    Har bir placeholder aniq turga ega bo'lishi kerak (%s::type yoki
+    CAST(%s AS type)) - aks holda PREPARE parametr turini oddiy execute dagi
+    literaldan boshqacha aniqlashi mumkin (masalan SELECT %s). Bunday query
+    va nomli parametrlar uchun None qaytadi.
+    """
+    count = 0
+    
+    def replace(match):
+        nonlocal count
+        token = match.group(1)
+        if token == '%':
+            return '%'
+        if token == 's':
+            typed = (query[match.end():].lstrip().startswith('::')
+                     or (_CAST_OPEN_RE.search(query, 0, match.start())
+                         and _CAST_AS_RE.match(query, match.end())))
+            if not typed:
+                raise ValueError(match.group(0))
+            count += 1
+            return f"${count}"
+        raise ValueError(match.group(0))
+    
+    try:
+        return _PLACEHOLDER_RE.sub(replace, query), count
+    except ValueError:
+        return None, 0
+
+class PreparedStatementCache:
+    """Connection bo'yicha PREPARE/EXECUTE keshi (LRU)
+    
+    Statement PREPARED_THRESHOLD marta ko'ringandan keyin o'sha connection da
+    PREPARE qilinadi va keyingi chaqiruvlar EXECUTE orqali ketadi - server
+    query ni qayta parse/plan qilmaydi. Connection lar WeakKeyDictionary da
+    saqlanadi: pool connection ni yopsa, uning keshi ham yo'qoladi.
+    Turi aniq berilmagan placeholder li query lar PREPARE qilinmaydi.
+    """
+    
+    PREPARABLE = ('select', 'with', 'insert', 'update', 'delete', 'values', 'table')
+    
+    def __init__(self, max_size: int = None, threshold: int = None):
+        self.max_size = max_size or config.PREPARED_CACHE_SIZE
+        self.threshold = threshold or config.PREPARED_THRESHOLD
+        self._statements = weakref.WeakKeyDictionary()
+        self._usage: 'collections.OrderedDict[Tuple[str, bool], int]' = collections.OrderedDict()
+        self._unpreparable: set = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.failures = 0
+    
+    def execute(self, cursor, query: str, params: Union[tuple, list] = None):
+        """Query ni bajarish - imkon bo'lsa prepared statement orqali"""
+        if not config.PREPARED_STATEMENTS_ENABLED:
+            cursor.execute(query, params)
+            return
+        
+        conn = cursor.connection
+        # Tranzaksiya boshida bo'lsa, yo'qolgan statement dan keyin qayta urinish xavfsiz
+        retryable = (conn.autocommit or
+                     conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+        for attempt in range(2):
+            try:
+                entry = self._lookup(cursor, query, params)
+                if entry is None:
+                    cursor.execute(query, params)
+                    return
+                
+                name, param_count = entry
+                if param_count:
+                    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * param_count)})", params)
+                else:
+                    cursor.execute(f"EXECUTE {name}")
+                return
+            except psycopg2.Error as e:
+                # Server statement ni yo'qotgan (DISCARD ALL, pgbouncer) - keshni tozalab
+                # qayta PREPARE qilish va bir marta qayta urinish
+                if e.pgcode != '26000':
+                    raise
+                self.invalidate(conn)
+                if attempt or not retryable:
+                    raise
+                if not conn.autocommit:
+                    conn.rollback()
+                logger.debug(f"Prepared statement lost, re-preparing: {e}")
+    
+    def _lookup(self, cursor, query: str, params) -> Optional[Tuple[str, int]]:
+        """Connection uchun prepared statement nomini topish yoki yaratish"""
+        if params is not None and not isinstance(params, (tuple, list)):
+            return None
+        if not query.lstrip()[:6].lower().startswith(self.PREPARABLE):
+            return None
+        
+        key = (_normalize_sql(query), params is not None)
+        conn = cursor.connection
+        
+        with self._lock:
+            if key in self._unpreparable:
+                return None
+            
+            statements = self._statements.setdefault(conn, collections.OrderedDict())
+            entry = statements.get(key)
+            if entry:
+                statements.move_to_end(key)
+                self.hits += 1
+                return entry
+            
+            self.misses += 1
+            # Bir martalik query lar PREPARE qilinmaydi
+            seen = self._usage.pop(key, 0) + 1
+            self._usage[key] = seen
+            while len(self._usage) > self.max_size * 4:
+                self._usage.popitem(last=False)
+            if seen < self.threshold:
+                return None
+        
+        text, param_count = _to_server_placeholders(query) if params is not None else (query, 0)
+        if text is None or (params is not None and len(params) != param_count):
+            with self._lock:
+                self._unpreparable.add(key)
+            return None
+        
+        import hashlib
+        name = 'pgu_' + hashlib.md5(repr(key).encode('utf-8')).hexdigest()[:16]
+        try:
+            self._prepare(cursor, name, text)
+        except psycopg2.Error as e:
+            if e.pgcode != '42P05':  # duplicate_prepared_statement - allaqachon bor
+                with self._lock:
+                    self._unpreparable.add(key)
+                    self.failures += 1
+                logger.debug(f"Statement not preparable, executing directly: {e}")
+                return None
+        
+        evicted = []
+        entry = (name, param_count)
+        with self._lock:
+            statements[key] = entry
+            while len(statements) > self.max_size:
+                _, (old_name, _) = statements.popitem(last=False)
+                evicted.append(old_name)
+                self.evictions += 1
+        
+        for old_name in evicted:
+            cursor.execute(f"DEALLOCATE {old_name}")
+        return entry
+    
+    def _prepare(self, cursor, name: str, text: str):
+        """PREPARE - tranzaksiya ichida savepoint bilan, xatolik tranzaksiyani buzmasin"""
+        if cursor.connection.autocommit:
+            cursor.execute(f"PREPARE {name} AS {text}")
+            return
+        
+        try:
+            cursor.execute(f"SAVEPOINT pgu_prepare; PREPARE {name} AS {text}; "
+                           f"RELEASE SAVEPOINT pgu_prepare")
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT pgu_prepare")
+            raise
+    
+    def invalidate(self, conn=None):
+        """Kesh ni tozalash - conn berilmasa hammasi (pool qayta yaratilganda)"""
+        with self._lock:
+            if conn is None:
+                self._statements.clear()
+            else:
+                self._statements.pop(conn, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss hisoblagichlari"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'failures': self.failures,
+                'hit_ratio': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                'connections': len(self._statements),
+                'statements': sum(len(s) for s in self._statements.values())
+            }
+
+# ============================================================================
+# METRICS HISTORY - RING BUFFER
+# ============================================================================
+
+# (bo'lim, kalit) - get_metrics natijasidan olinadigan sonli maydonlar
+METRIC_FIELDS = (
+    ('connections', 'total_connections'),
+    ('connections', 'active_connections'),
+    ('connections', 'idle_connections'),
+    ('connections', 'idle_in_transaction'),
+    ('connections', 'waiting_connections'),
+    ('databases', 'total_size_bytes'),
+    ('cache', 'cache_hit_ratio'),
+    ('cache', 'index_cache_ratio'),
+    ('indexes', 'index_usage_ratio'),
+    ('transactions', 'xact_commit'),
+    ('transactions', 'xact_rollback'),
+    ('transactions', 'commit_ratio'),
+    ('replication', 'replication_lag_bytes'),
+)
+METRIC_NAMES = tuple(key for _, key in METRIC_FIELDS) + ('lock_count',)
+
+def metrics_sample(metrics: Dict[str, Any]) -> Tuple[float, ...]:
+    """get_metrics natijasini sonli namunaga aylantirish (yo'q qiymat - NaN)"""
+    values = []
+    for section, key in METRIC_FIELDS:
+        value = (metrics.get(section) or {}).get(key)
+        values.append(float(value) if value is not None else float('nan'))
+    values.append(float(sum(lock['lock_count'] for lock in metrics.get('locks') or [])))
+    return tuple(values)
+
+class MetricsRingBuffer:
+    """Metrikalar tarixi - qat'iy sig'imli, vaqt bo'yicha indekslangan ring buffer
+    
+    Namunalar har bir maydon uchun alohida array('d') da saqlanadi. append va
+    eskirganlarni o'chirish O(1) (amortized), vaqt oralig'i bo'yicha qidiruv
+    binary search bilan.
+    """
+    
+    def __init__(self, capacity: int = None, retention_seconds: float = None):
+        if retention_seconds is None:
+            retention_seconds = config.METRICS_RETENTION_DAYS * 86400
+        if capacity is None:
+            capacity = config.METRICS_HISTORY_CAPACITY or int(retention_seconds / max(config.MONITOR_INTERVAL, 1))
+        
+        self.capacity = max(1, capacity)
+        self.retention_seconds = retention_seconds
+        self._timestamps = array.array('d')
+        self._values = [array.array('d') for _ in METRIC_NAMES]
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, timestamp: float, values: Sequence[float]):
+        """Namuna qo'shish - O(1)"""
+        with self._lock:
+            allocated = len(self._timestamps)
+            
+            if self._size < allocated:
+                pos = (self._start + self._size) % allocated
+                self._size += 1
+            elif allocated < self.capacity:
+                if self._start:
+                    self._rotate()
+                pos = None
+                self._size += 1
+            else:
+                # To'la - eng eskisi ustiga yoziladi
+                pos = self._start
+                self._start = (self._start + 1) % allocated
+            
+            if pos is None:
+                self._timestamps.append(timestamp)
+                for column, value in zip(self._values, values):
+                    column.append(value)
+            else:
+                self._timestamps[pos] = timestamp
+                for column, value in zip(self._values, values):
+                    column[pos] = value
+            
+            self._evict(timestamp - self.retention_seconds)
+    
+    def _rotate(self):
+        """Fizik tartibni mantiqiy tartibga keltirish (faqat o'sish bosqichida)"""
+        start = self._start
+        self._timestamps = self._timestamps[start:] + self._timestamps[:start]
+        self._values = [column[start:] + column[:start] for column in self._values]
+        self._start = 0
+    
+    def _evict(self, cutoff: float):
+        """Retention dan eski namunalarni tashlash"""
+        allocated = len(self._timestamps)
+        while self._size and self._timestamps[self._start] < cutoff:
+            self._start = (self._start + 1) % allocated
+            self._size -= 1
+    
+    def _physical(self, index: int) -> int:
+        return (self._start + index) % len(self._timestamps)
+    
+    def _bisect(self, timestamp: float) -> int:
+        """timestamp dan kichik bo'lmagan birinchi mantiqiy indeks"""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[self._physical(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def range(self, start: float = None, end: float = None,
+              fields: Sequence[str] = None) -> Dict[str, List[float]]:
+        """[start, end] oralig'idagi namunalar - ustunli ko'rinishda"""
+        fields = list(fields or METRIC_NAMES)
+        positions = [METRIC_NAMES.index(name) for name in fields]
+        
+        with self._lock:
+            # _rotate() _values ni almashtiradi - ustunlar lock ichida olinadi
+            columns = [self._values[position] for position in positions]
+            first = self._bisect(start) if start is not None else 0
+            last = self._bisect(end + 1e-9) if end is not None else self._size
+            indexes = [self._physical(i) for i in range(first, last)]
+            result = {'timestamp': [self._timestamps[i] for i in indexes]}
+            for name, column in zip(fields, columns):
+                result[name] = [column[i] for i in indexes]
+        
+        return result
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Oxirgi namuna"""
+        with self._lock:
+            if not self._size:
+                return None
+            pos = self._physical(self._size - 1)
+            sample = {'timestamp': self._timestamps[pos]}
+            for name, column in zip(METRIC_NAMES, self._values):
+                sample[name] = column[pos]
+            return sample
+
+# ============================================================================
+# METRICS TIME-SERIES STORE - MMAP
+# ============================================================================
+
+class MetricsTimeSeriesStore:
+    """Deployment metrikalari uchun append-only, qat'iy kenglikdagi fayl
+    
+    Fayl tuzilishi: HEADER_SIZE baytli sarlavha (magic, maydonlar ro'yxati),
+    keyin har bir namuna uchun <timestamp, qiymatlar..., crc32> yozuvi.
+    Yozish bitta O_APPEND write, o'qish mmap orqali.
+    """
+    
+    MAGIC = b'PGUTSDB1'
+    HEADER_SIZE = 512
+    
+    def __init__(self, path: str, fields: Sequence[str] = METRIC_NAMES):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._map: Optional[mmap.mmap] = None
+        self._map_size = 0
+        
+        if not os.path.exists(path):
+            self._create(list(fields))
+        
+        self.fields = self._read_header()
+        self._record = struct.Struct('<d%ddI' % len(self.fields))
+        self._repair_tail()
+        
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        self._reader = open(path, 'rb')
+        self._count = (os.fstat(self._fd).st_size - self.HEADER_SIZE) // self._record.size
+        self._last_ts = self._timestamp_at(self._count - 1) if self._count else float('-inf')
+        
+        # Yozishda maydonlar tartibi fayldagi tartibga moslanadi
+        self._input_fields = list(fields)
+    
+    @classmethod
+    def for_deployment(cls, name: str) -> 'MetricsTimeSeriesStore':
+        """config.METRICS_DIR dagi deployment fayli"""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+        return cls(os.path.join(config.METRICS_DIR, f"{safe_name}.tsdb"))
+    
+    def _create(self, fields: List[str]):
+        """Sarlavhani atomik yozish"""
+        names = ','.join(fields).encode('utf-8')
+        header = self.MAGIC + struct.pack('<I', len(names)) + names
+        if len(header) > self.HEADER_SIZE:
+            raise ValueError("Too many metric fields for time-series header")
+        
+        config.ensure_dirs()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header.ljust(self.HEADER_SIZE, b'\0'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+    
+    def _read_header(self) -> List[str]:
+        with open(self.path, 'rb') as f:
+            header = f.read(self.HEADER_SIZE)
+        if len(header) < self.HEADER_SIZE or not header.startswith(self.MAGIC):
+            raise ValueError(f"Not a metrics time-series file: {self.path}")
+        
+        length = struct.unpack_from('<I', header, len(self.MAGIC))[0]
+        start = len(self.MAGIC) + 4
+        return header[start:start + length].decode('utf-8').split(',')
+    
+    def _repair_tail(self):
+        """Crash dan keyin chala yoki buzilgan oxirgi yozuvni kesish"""
+        size = os.path.getsize(self.path)
+        valid = self.HEADER_SIZE + (size - self.HEADER_SIZE) // self._record.size * self._record.size
+        
+        with open(self.path, 'r+b') as f:
+            while valid > self.HEADER_SIZE:
+                f.seek(valid - self._record.size)
+                record = f.read(self._record.size)
+                if zlib.crc32(record[:-4]) == struct.unpack_from('<I', record, len(record) - 4)[0]:
+                    break
+                valid -= self._record.size
+            
+            if valid != size:
+                f.truncate(valid)
+                logger.warning(f"Truncated {size - valid} bytes of torn samples in {self.path}")
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+    
+    def _refresh(self):
+        """Boshqa jarayon (masalan daemon) qo'shgan yozuvlarni hisobga olish"""
+        count = (os.fstat(self._reader.fileno()).st_size - self.HEADER_SIZE) // self._record.size
+        if count > self._count:
+            self._count = count
+            self._last_ts = max(self._last_ts, self._timestamp_at(count - 1))
+    
+    def append(self, timestamp: float, values: Sequence[float]):
+        """Namuna yozish - O(1), bitta write"""
+        if self._input_fields != self.fields:
+            by_name = dict(zip(self._input_fields, values))
+            values = [by_name.get(name, float('nan')) for name in self.fields]
+        
+        with self._lock:
+            # Bir faylga bir nechta jarayon (daemon va CLI monitor) yozishi mumkin -
+            # fayl lock ostida boshqalar qo'shgan yozuvlar avval hisobga olinadi
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                # Binary search uchun vaqt kamaymasligi kerak
+                timestamp = max(timestamp, self._last_ts)
+                payload = struct.pack('<d%dd' % len(self.fields), timestamp, *values)
+                os.write(self._fd, payload + struct.pack('<I', zlib.crc32(payload)))
+                self._count += 1
+                self._last_ts = timestamp
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._dirty = True
+            
+            if time.monotonic() - self._last_fsync >= config.TIMESERIES_FSYNC_INTERVAL:
+                self._sync()
+    
+    def _sync(self):
+        os.fsync(self._fd)
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+    
+    def flush(self):
+        """Diskka majburan yozish"""
+        with self._lock:
+            if self._dirty:
+                self._sync()
+    
+    def _view(self) -> mmap.mmap:
+        """Fayl o'sgan bo'lsa mmap ni yangilash"""
+        size = self.HEADER_SIZE + self._count * self._record.size
+        if self._map is None or self._map_size != size:
+            # Eski map ni yopmaymiz - davom etayotgan scan lar memoryview ushlab turgan bo'lishi mumkin
+            self._map = mmap.mmap(self._reader.fileno(), size, access=mmap.ACCESS_READ)
+            self._map_size = size
+        return self._map
+    
+    def _timestamp_at(self, index: int) -> float:
+        if self._map is None or index * self._record.size + self.HEADER_SIZE >= self._map_size:
+            self._view()
+        return struct.unpack_from('<d', self._map, self.HEADER_SIZE + index * self._record.size)[0]
+    
+    def _bisect(self, timestamp: float) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamp_at(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _records(self, start: float = None, end: float = None) -> Iterator[Tuple[float, ...]]:
+        """[start, end] oralig'idagi yozuvlar - nusxa olmasdan"""
+        with self._lock:
+            self._refresh()
+            view = self._view()
+            first = self._bisect(start) if start is not None else 0
+            last = self._bisect(end + 1e-9) if end is not None else self._count
+        
+        if first >= last:
+            return iter(())
+        
+        size = self._record.size
+        data = memoryview(view)[self.HEADER_SIZE + first * size:self.HEADER_SIZE + last * size]
+        return self._record.iter_unpack(data)
+    
+    def scan(self, start: float = None, end: float = None,
+             fields: Sequence[str] = None) -> Dict[str, List[float]]:
+        """Oraliqdagi namunalar - MetricsRingBuffer.range bilan bir xil ko'rinishda"""
+        fields = list(fields or self.fields)
+        positions = [self.fields.index(name) + 1 for name in fields]
+        result = {'timestamp': []}
+        result.update((name, []) for name in fields)
+        
+        columns = [result[name] for name in fields]
+        timestamps = result['timestamp']
+        for record in self._records(start, end):
+            timestamps.append(record[0])
+            for column, position in zip(columns, positions):
+                column.append(record[position])
+        
+        return result
+    
+    def summarize(self, start: float = None, end: float = None) -> Dict[str, Dict[str, float]]:
+        """Har bir maydon uchun count/min/avg/max/last - bitta o'tishda"""
+        stats = {name: {'count': 0, 'min': float('inf'), 'max': float('-inf'),
+                        'sum': 0.0, 'last': float('nan')} for name in self.fields}
+        entries = list(zip(range(1, len(self.fields) + 1), stats.values()))
         
-        for name, url in self.urls.items():
-            if query in name.lower() or \
-               (url.database and query in url.database.lower()) or \
-               (url.host and query in url.host.lower()) or \
-               any(query in tag.lower() for tag in url.tags):
-                results.append((name, url))
+        for record in self._records(start, end):
+            for position, entry in entries:
+                value = record[position]
+                if value != value:  # NaN
+                    continue
+                entry['count'] += 1
+                entry['sum'] += value
+                entry['last'] = value
+                if value < entry['min']:
+                    entry['min'] = value
+                if value > entry['max']:
+                    entry['max'] = value
+        
+        for entry in stats.values():
+            count = entry.pop('count')
+            total = entry.pop('sum')
+            entry['samples'] = count
+            entry['avg'] = total / count if count else float('nan')
+            if not count:
+                entry['min'] = entry['max'] = float('nan')
+        
+        return stats
+    
+    def bounds(self) -> Optional[Tuple[float, float]]:
+        """Birinchi va oxirgi namuna vaqti"""
+        with self._lock:
+            self._refresh()
+            if not self._count:
+                return None
+            return self._timestamp_at(0), self._timestamp_at(self._count - 1)
+    
+    def close(self):
+        """Resurslarni yopish"""
+        with self._lock:
+            if self._dirty:
+                self._sync()
+            self._map = None
+            self._reader.close()
+            os.close(self._fd)
+
+# ============================================================================
+# METRICS LOG - APPEND-ONLY NDJSON
+# ============================================================================
+
+class MetricsLog:
+    """Deployment metrikalari uchun bufferlangan append-only NDJSON log
+    
+    Yozuvlar xotirada to'planib, hajm yoki vaqt chegarasida bitta append bilan
+    yoziladi. Fayl max_entries ning ikki barobaridan oshganda oxirgi
+    max_entries ta yozuvgacha siqiladi (atomik replace).
+    """
+    
+    def __init__(self, path: str, max_entries: int = None):
+        self.path = path
+        self.max_entries = max_entries or config.METRICS_LOG_MAX_ENTRIES
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._lines: Optional[int] = None
+    
+    @classmethod
+    def for_deployment(cls, name: str) -> 'MetricsLog':
+        """config.METRICS_DIR dagi deployment logi"""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+        return cls(os.path.join(config.METRICS_DIR, f"{safe_name}.ndjson"))
+    
+    def append(self, metrics: Dict[str, Any], timestamp: str = None):
+        """Yozuv qo'shish - diskka bufer to'lganda yoki interval o'tganda tushadi"""
+        entry = {'timestamp': timestamp or datetime.datetime.now().isoformat(), 'metrics': metrics}
+        line = json.dumps(entry, default=str, ensure_ascii=False, separators=(',', ':'))
+        
+        with self._lock:
+            self._buffer.append(line)
+            if (len(self._buffer) >= config.METRICS_LOG_FLUSH_SIZE or
+                    time.monotonic() - self._last_flush >= config.METRICS_LOG_FLUSH_INTERVAL):
+                self._flush()
+    
+    def extend(self, entries: Iterable[Dict[str, Any]]):
+        """Tayyor yozuvlarni qo'shish (migratsiya uchun)"""
+        for entry in entries:
+            self.append(entry.get('metrics', {}), entry.get('timestamp'))
+        self.flush()
+    
+    def _count_lines(self) -> int:
+        if self._lines is None:
+            self._lines = 0
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        self._lines += block.count(b'\n')
+        return self._lines
+    
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
         
-        return results
+        lines = self._count_lines()
+        config.ensure_dirs()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(self._buffer) + '\n')
+        self._lines = lines + len(self._buffer)
+        self._buffer = []
+        
+        if self._lines > self.max_entries * 2:
+            self._compact()
+    
+    def flush(self):
+        """Buferni diskka yozish"""
+        with self._lock:
+            self._flush()
+    
+    def _compact(self):
+        """Faqat oxirgi max_entries ta yozuvni qoldirish"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            tail = collections.deque(f, maxlen=self.max_entries)
+        
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        
+        self._lines = len(tail)
+        logger.debug(f"🗜️ Compacted metrics log {self.path} to {self._lines} entries")
+    
+    def tail(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oxirgi yozuvlar"""
+        with self._lock:
+            self._flush()
+            if not os.path.exists(self.path):
+                return []
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = collections.deque(f, maxlen=limit)
+        
+        return [json.loads(line) for line in lines if line.strip()]
+    
+    def remove(self):
+        """Logni o'chirish"""
+        with self._lock:
+            self._buffer = []
+            self._lines = 0
+            if os.path.exists(self.path):
+                os.remove(self.path)
 
 # ============================================================================
 # POSTGRESQL MANAGER - CORE FUNCTIONALITY
@@ -592,16 +2516,41 @@ class PostgreSQLManager:
         self.connection_pool = None
         self.monitoring_active = False
         self.monitor_thread = None
-        self.metrics_history: List[Dict] = []
+        self.metrics_history = MetricsRingBuffer()
+        self.last_metrics: Optional[Dict[str, Any]] = None
+        self.timeseries: Optional[MetricsTimeSeriesStore] = None
         self.alerts: List[Dict] = []
+        self.deployment_name: Optional[str] = None
         self.cache: Dict[str, Any] = {}
+        self.last_import_stats: Dict[str, Any] = {}
+        self.last_load_stats: Dict[str, Any] = {}
+        self.statement_cache = PreparedStatementCache()
         
         if database_url:
             self.create_pool()
     
+    @property
+    def cache_namespace(self) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """result_cache namespace i: (cluster, database, user)"""
+        url = self.database_url
+        if url is None:
+            return None
+        return (f"{url.host}:{url.port}", url.database, url.username)
+    
+    def invalidate_cache(self, *tags: str):
+        """Shu cluster keshini eskirtirish - teglar bo'yicha yoki (teg bo'lmasa) to'liq"""
+        namespace = self.cache_namespace
+        if namespace is None:
+            return
+        if tags:
+            result_cache.bump(namespace[0], *tags)
+        else:
+            result_cache.invalidate(namespace[0])
+    
     @perf_monitor
     def create_pool(self):
         """Connection pool yaratish"""
+        self.statement_cache.invalidate()
         try:
             params = self.database_url.get_connection_params()
             params['application_name'] = 'PostgreSQL_Ultimate'
@@ -647,16 +2596,19 @@ class PostgreSQLManager:
     
     @perf_monitor
     def execute_query(self, query: str, params: tuple = None, 
-                     fetch: bool = True) -> Optional[List[Dict]]:
-        """Query bajarish - optimallashtirilgan"""
+                     fetch: bool = True, row_format: str = 'dict') -> Optional[List[Dict]]:
+        """Query bajarish - optimallashtirilgan (row_format: dict | tuple | record | columns)"""
         start_time = time.time()
+        cursor_factory = psycopg2.extras.RealDictCursor if row_format == 'dict' else None
         
         try:
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
+            with self.get_cursor(cursor_factory=cursor_factory) as cursor:
+                self.statement_cache.execute(cursor, query, params)
                 
                 if fetch and cursor.description:
                     result = cursor.fetchall()
+                    if cursor_factory is None:
+                        result = _shape_rows([d[0] for d in cursor.description], result, row_format)
                     duration = time.time() - start_time
                     
                     if duration > config.SLOW_QUERY_THRESHOLD:
@@ -668,6 +2620,49 @@ class PostgreSQLManager:
             logger.error(f"Query failed: {e}")
             raise
     
+    def iter_query(self, query: str, params: tuple = None, itersize: int = None,
+                   batch_size: int = None, row_format: str = 'dict') -> Iterator:
+        """Katta natijani server-side (named) cursor orqali oqimli o'qish
+        
+        batch_size berilmasa qatorlar bittadan, berilsa batch ko'rinishida
+        qaytadi ('columns' formati doim batch bo'yicha). Serverdan har safar
+        itersize ta qator olinadi - xotira natija hajmiga bog'liq emas.
+        """
+        if itersize is None:
+            itersize = config.STREAM_ITERSIZE
+        if row_format == 'columns' and not batch_size:
+            batch_size = itersize
+        cursor_factory = psycopg2.extras.RealDictCursor if row_format == 'dict' else None
+        
+        with self.get_connection() as conn:
+            try:
+                with conn.cursor(name=f"pgu_stream_{os.urandom(8).hex()}",
+                                 cursor_factory=cursor_factory) as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query, params)
+                    
+                    if batch_size:
+                        while True:
+                            rows = cursor.fetchmany(batch_size)
+                            if not rows:
+                                break
+                            if cursor_factory is None:
+                                rows = _shape_rows([d[0] for d in cursor.description], rows, row_format)
+                            yield rows
+                    elif row_format == 'record':
+                        first = next(iter(cursor), None)
+                        if first is not None:
+                            make = _record_class(tuple(d[0] for d in cursor.description))._make
+                            yield make(first)
+                            yield from map(make, cursor)
+                    else:
+                        yield from cursor
+                conn.commit()
+            except BaseException:
+                # Iteratsiya erta to'xtatilsa ham (GeneratorExit) tranzaksiya yopiladi
+                conn.rollback()
+                raise
+    
     @perf_monitor
     def execute_many(self, query: str, params_list: List[tuple]) -> int:
         """Ko'p querylarni bajarish"""
@@ -700,6 +2695,7 @@ class PostgreSQLManager:
     # ========================================================================
     
     @perf_monitor
+    @invalidates_cache('databases', 'privileges')
     def create_database(self, db_name: str, owner: str = None, 
                        encoding: str = 'UTF8') -> bool:
         """Yangi database yaratish"""
@@ -729,6 +2725,7 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
+    @invalidates_cache('databases', 'privileges')
     def drop_database(self, db_name: str, force: bool = False) -> bool:
         """Database o'chirish"""
         if db_name in ['postgres', 'template0', 'template1']:
@@ -752,32 +2749,59 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
-    @cache_result(ttl=60)
-    def list_databases(self) -> List[Dict]:
-        """Database lar ro'yxati"""
-        query = """
+    @cache_result(tags=('databases',))
+    def list_databases(self, include_sizes: bool = True) -> List[Dict]:
+        """Database lar ro'yxati
+        
+        pg_stat_activity bir marta agregatsiya qilinadi, har bir o'lcham bir marta
+        hisoblanadi. include_sizes=False - pg_database_size siz tezkor rejim
+        (har bir database papkasini aylanib chiqmaydi), tartib nom bo'yicha.
+        """
+        if include_sizes:
+            # CONNECT huquqi bo'lmasa pg_database_size xato beradi - o'lcham null.
+            # pg_read_all_stats PG10 dan bor - eskisida pg_has_role xato bermasligi uchun
+            # avval rol mavjudligi tekshiriladi (CASE baholash tartibini kafolatlaydi)
+            size_expr = """CASE WHEN has_database_privilege(d.oid, 'CONNECT')
+                                THEN pg_database_size(d.oid)
+                                WHEN EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'pg_read_all_stats')
+                                THEN CASE WHEN pg_has_role('pg_read_all_stats', 'MEMBER')
+                                          THEN pg_database_size(d.oid) END
+                           END"""
+            order_by = "s.size_bytes DESC NULLS LAST, d.datname"
+        else:
+            size_expr = "NULL::bigint"
+            order_by = "d.datname"
+        
+        query = f"""
+            WITH activity AS (
+                SELECT datid, count(*) as connections
+                FROM pg_stat_activity
+                WHERE datid IS NOT NULL
+                GROUP BY datid
+            ),
+            sizes AS (
+                SELECT d.oid, {size_expr} as size_bytes
+                FROM pg_database d
+                WHERE d.datistemplate = false
+            )
             SELECT 
                 d.datname,
                 pg_get_userbyid(d.datdba) as owner,
-                pg_size_pretty(pg_database_size(d.datname)) as size,
-                pg_database_size(d.datname) as size_bytes,
+                pg_size_pretty(s.size_bytes) as size,
+                s.size_bytes,
                 d.datconnlimit as connection_limit,
-                (SELECT count(*) FROM pg_stat_activity WHERE datname = d.datname) as connections,
+                coalesce(a.connections, 0) as connections,
                 d.datistemplate as is_template,
                 d.datallowconn as allow_connections,
                 pg_encoding_to_char(d.encoding) as encoding,
                 d.datcollate as collate,
                 d.datctype as ctype,
                 d.datfrozenxid::text as frozen_xid,
-                d.datminmxid::text as min_mxid,
-                pg_size_pretty(sum(pg_relation_size(oid))::bigint) as total_table_size
+                d.datminmxid::text as min_mxid
             FROM pg_database d
-            LEFT JOIN pg_class c ON c.reltablespace = d.oid
-            WHERE d.datistemplate = false
-            GROUP BY d.oid, d.datname, d.datdba, d.datconnlimit, d.datistemplate, 
-                     d.datallowconn, d.encoding, d.datcollate, d.datctype, 
-                     d.datfrozenxid, d.datminmxid
-            ORDER BY size_bytes DESC
+            JOIN sizes s ON s.oid = d.oid
+            LEFT JOIN activity a ON a.datid = d.oid
+            ORDER BY {order_by}
         """
         
         return self.execute_query(query) or []
@@ -787,6 +2811,7 @@ class PostgreSQLManager:
     # ========================================================================
     
     @perf_monitor
+    @invalidates_cache('roles', 'privileges')
     def create_user(self, username: str, password: str = None,
                    superuser: bool = False, createdb: bool = False,
                    createrole: bool = False, login: bool = True,
@@ -849,6 +2874,7 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
+    @invalidates_cache('roles', 'privileges', 'databases')
     def drop_user(self, username: str, reassign_to: str = None) -> bool:
         """User o'chirish"""
         if username == 'postgres':
@@ -869,35 +2895,81 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
-    @cache_result(ttl=30)
-    def list_users(self) -> List[Dict]:
-        """Userlar ro'yxati"""
+    @cache_result(tags=('roles', 'privileges'))
+    def list_users(self, pattern: str = None, login_only: bool = False,
+                   limit: int = None, offset: int = 0) -> List[Dict]:
+        """Userlar ro'yxati
+        
+        Sahifa avval tanlanadi, keyin sessiyalar, a'zoliklar va jadval grantlari
+        (pg_class.relacl + aclexplode) alohida agregatsiya qilinib faqat shu
+        rollarga ulanadi - rollar x sessiyalar x grantlar ko'paytmasi yo'q.
+        pattern - ILIKE shabloni (masalan 'app_%').
+        """
         query = """
+            WITH roles AS (
+                SELECT oid, rolname, rolsuper, rolcreatedb, rolcreaterole,
+                       rolinherit, rolcanlogin, rolconnlimit, rolvaliduntil
+                FROM pg_roles
+                WHERE rolname NOT LIKE 'pg\\_%%'
+                    AND (%(pattern)s::text IS NULL OR rolname ILIKE %(pattern)s)
+                    AND (NOT %(login_only)s OR rolcanlogin)
+                ORDER BY rolname
+                LIMIT %(limit)s OFFSET %(offset)s
+            ),
+            activity AS (
+                SELECT 
+                    usesysid,
+                    count(*) as active_connections,
+                    array_agg(DISTINCT datname) FILTER (WHERE datname IS NOT NULL) as databases_accessed
+                FROM pg_stat_activity
+                WHERE usesysid IN (SELECT oid FROM roles)
+                GROUP BY usesysid
+            ),
+            memberships AS (
+                SELECT m.member, array_agg(DISTINCT g.rolname) as granted_roles
+                FROM pg_auth_members m
+                JOIN pg_roles g ON g.oid = m.roleid
+                WHERE m.member IN (SELECT oid FROM roles)
+                GROUP BY m.member
+            ),
+            table_grants AS (
+                -- Joriy database dagi jadvallar bo'yicha to'g'ridan-to'g'ri grantlar (egalik hisobga olinmaydi)
+                SELECT acl.grantee, count(DISTINCT c.oid) as tables_granted
+                FROM pg_class c
+                CROSS JOIN LATERAL aclexplode(c.relacl) acl
+                WHERE c.relacl IS NOT NULL
+                    AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+                    AND acl.grantee <> c.relowner
+                    AND acl.grantee IN (SELECT oid FROM roles)
+                GROUP BY acl.grantee
+            )
             SELECT 
-                rolname as username,
-                rolsuper as is_superuser,
-                rolcreatedb as can_create_db,
-                rolcreaterole as can_create_role,
-                rolinherit as inherit_rights,
-                rolcanlogin as can_login,
-                rolconnlimit as connection_limit,
-                rolvaliduntil as valid_until,
-                (SELECT count(*) FROM pg_stat_activity WHERE usename = rolname) as active_connections,
-                array_agg(DISTINCT datname) as databases_accessed,
-                array_agg(DISTINCT grantee) as granted_roles
-            FROM pg_roles r
-            LEFT JOIN pg_stat_activity a ON a.usename = r.rolname
-            LEFT JOIN information_schema.table_privileges p ON p.grantee = r.rolname
-            WHERE rolname NOT LIKE 'pg_%'
-            GROUP BY r.oid, rolname, rolsuper, rolcreatedb, rolcreaterole, 
-                     rolinherit, rolcanlogin, rolconnlimit, rolvaliduntil
-            ORDER BY rolname
+                r.rolname as username,
+                r.rolsuper as is_superuser,
+                r.rolcreatedb as can_create_db,
+                r.rolcreaterole as can_create_role,
+                r.rolinherit as inherit_rights,
+                r.rolcanlogin as can_login,
+                r.rolconnlimit as connection_limit,
+                r.rolvaliduntil as valid_until,
+                coalesce(a.active_connections, 0) as active_connections,
+                coalesce(a.databases_accessed, '{}') as databases_accessed,
+                coalesce(m.granted_roles, '{}') as granted_roles,
+                coalesce(t.tables_granted, 0) as tables_granted
+            FROM roles r
+            LEFT JOIN activity a ON a.usesysid = r.oid
+            LEFT JOIN memberships m ON m.member = r.oid
+            LEFT JOIN table_grants t ON t.grantee = r.oid
+            ORDER BY r.rolname
         """
         
-        return self.execute_query(query) or []
+        params = {'pattern': pattern, 'login_only': login_only, 'limit': limit, 'offset': offset}
+        return self.execute_query(query, params) or []
     
     def _generate_strong_password(self, length: int = None) -> str:
         """Kuchli parol generatsiya qilish"""
+        import secrets
+        
         if length is None:
             length = config.PASSWORD_MIN_LENGTH
         
@@ -933,6 +3005,7 @@ class PostgreSQLManager:
     # ========================================================================
     
     @perf_monitor
+    @invalidates_cache('privileges')
     def grant_privileges(self, username: str, db_name: str = None,
                         schema: str = 'public', 
                         privileges: List[str] = None,
@@ -970,6 +3043,7 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
+    @invalidates_cache('privileges')
     def revoke_privileges(self, username: str, db_name: str = None,
                          schema: str = 'public',
                          privileges: List[str] = None) -> bool:
@@ -997,75 +3071,146 @@ class PostgreSQLManager:
             logger.error(f"Failed to revoke privileges: {e}")
             return False
     
-    @perf_monitor
-    @cache_result(ttl=60)
-    def get_user_privileges(self, username: str) -> List[Dict]:
-        """User ruxsatlarini olish"""
-        privileges = []
-        
-        with self.get_cursor() as cursor:
-            # Database privileges
-            cursor.execute("""
-                SELECT 
-                    datname,
-                    has_database_privilege(%s, datname, 'CONNECT') as can_connect,
-                    has_database_privilege(%s, datname, 'CREATE') as can_create,
-                    has_database_privilege(%s, datname, 'TEMPORARY') as can_temp
-                FROM pg_database
-                WHERE datistemplate = false
-            """, (username, username, username))
-            
-            for row in cursor.fetchall():
-                privileges.append({
-                    'type': 'database',
-                    'name': row['datname'],
-                    'privileges': {
-                        'connect': row['can_connect'],
-                        'create': row['can_create'],
-                        'temporary': row['can_temp']
-                    }
-                })
-            
-            # Table privileges
-            cursor.execute("""
-                SELECT 
-                    schemaname,
-                    tablename,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'SELECT') as can_select,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'INSERT') as can_insert,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'UPDATE') as can_update,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'DELETE') as can_delete,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'TRUNCATE') as can_truncate,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'REFERENCES') as can_reference,
-                    has_table_privilege(%s, schemaname||'.'||tablename, 'TRIGGER') as can_trigger
-                FROM pg_tables
-                WHERE schemaname NOT IN ('information_schema', 'pg_catalog')
-                LIMIT 100
-            """, (username, username, username, username, username, username, username))
+    # Obyekt turi -> ACL da bo'lishi mumkin bo'lgan ruxsatlar
+    PRIVILEGE_TYPES = {
+        'database': ('connect', 'create', 'temporary'),
+        'schema': ('usage', 'create'),
+        'table': ('select', 'insert', 'update', 'delete', 'truncate', 'references', 'trigger'),
+        'sequence': ('usage', 'select', 'update'),
+        'function': ('execute',)
+    }
+    
+    # ACL lar bitta o'tishda aclexplode bilan yechiladi; NULL ACL - egasi uchun default
+    # (acldefault). Superuser uchun ACL dekodlanmaydi - privileges NULL (hammasi).
+    # include_denied - hech qanday ruxsat yo'q obyektlar ham bo'sh massiv bilan.
+    USER_PRIVILEGES_QUERY = """
+        WITH users AS (
+            SELECT oid as user_oid, rolname as username, rolsuper
+            FROM pg_roles
+            WHERE rolname = ANY(%(usernames)s::name[])
+        ),
+        grantees AS (
+            -- User ning o'zi, meros oladigan rollari va PUBLIC (0)
+            SELECT u.user_oid, r.oid as grantee
+            FROM users u
+            JOIN pg_roles r ON pg_has_role(u.user_oid, r.oid, 'USAGE')
+            WHERE NOT u.rolsuper
+            UNION ALL
+            SELECT user_oid, 0 FROM users WHERE NOT rolsuper
+        ),
+        all_objects AS (
+            SELECT 'database' as type, NULL::name as schema, d.datname::text as name,
+                   coalesce(d.datacl, acldefault('d', d.datdba)) as acl
+            FROM pg_database d
+            WHERE NOT d.datistemplate
+            UNION ALL
+            SELECT 'schema', NULL, n.nspname::text, coalesce(n.nspacl, acldefault('n', n.nspowner))
+            FROM pg_namespace n
+            WHERE n.nspname NOT IN ('pg_catalog', 'information_schema') AND n.nspname NOT LIKE 'pg\\_%%'
+            UNION ALL
+            SELECT CASE WHEN c.relkind = 'S' THEN 'sequence' ELSE 'table' END, n.nspname, c.relname::text,
+                   coalesce(c.relacl, acldefault(CASE WHEN c.relkind = 'S' THEN 's' ELSE 'r' END::"char", c.relowner))
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f', 'S')
+                AND n.nspname NOT IN ('pg_catalog', 'information_schema') AND n.nspname NOT LIKE 'pg\\_%%'
+            UNION ALL
+            SELECT 'function', n.nspname, p.proname || '(' || pg_get_function_identity_arguments(p.oid) || ')',
+                   coalesce(p.proacl, acldefault('f', p.proowner))
+            FROM pg_proc p
+            JOIN pg_namespace n ON n.oid = p.pronamespace
+            WHERE n.nspname NOT IN ('pg_catalog', 'information_schema') AND n.nspname NOT LIKE 'pg\\_%%'
+        ),
+        objects AS (
+            SELECT * FROM all_objects
+            WHERE %(object_types)s::text[] IS NULL OR type = ANY(%(object_types)s)
+        )
+        SELECT u.username, o.type, o.schema, o.name,
+               array_agg(DISTINCT lower(a.privilege_type)) as privileges
+        FROM objects o
+        CROSS JOIN LATERAL aclexplode(o.acl) a
+        JOIN grantees g ON g.grantee = a.grantee
+        JOIN users u ON u.user_oid = g.user_oid
+        GROUP BY u.username, o.type, o.schema, o.name
+        UNION ALL
+        SELECT u.username, o.type, o.schema, o.name, NULL
+        FROM users u
+        CROSS JOIN objects o
+        WHERE u.rolsuper
+        UNION ALL
+        SELECT u.username, o.type, o.schema, o.name, '{}'::text[]
+        FROM users u
+        CROSS JOIN objects o
+        WHERE %(include_denied)s AND NOT u.rolsuper
+            AND NOT EXISTS (SELECT 1
+                            FROM aclexplode(o.acl) a
+                            JOIN grantees g ON g.grantee = a.grantee
+                            WHERE g.user_oid = u.user_oid)
+        ORDER BY 1, 2, 3, 4
+    """
+    
+    def iter_user_privileges(self, usernames: Union[str, Sequence[str]],
+                             object_types: Sequence[str] = None,
+                             include_denied: bool = False) -> Iterator[Dict]:
+        """User(lar) ruxsatlari - set-based, server-side cursor orqali oqimli
+        
+        Database, schema, table (view lar bilan), sequence va function lar.
+        Har bir qator: {'username', 'type', ['schema'], 'name', 'privileges'}.
+        Default holatda faqat kamida bitta ruxsat bor obyektlar qaytadi;
+        include_denied=True - barcha obyektlar (ruxsatlari False bilan), eski
+        get_user_privileges kabi. Bir nechta user ni bitta so'rovda solishtirish mumkin.
+        """
+        if isinstance(usernames, str):
+            usernames = [usernames]
+        if object_types:
+            unknown = set(object_types) - set(self.PRIVILEGE_TYPES)
+            if unknown:
+                raise ValueError(f"Unknown object types: {', '.join(sorted(unknown))}")
+        
+        params = {'usernames': list(usernames),
+                  'object_types': list(object_types) if object_types else None,
+                  'include_denied': bool(include_denied)}
+        for username, object_type, schema, name, granted in self.iter_query(
+                self.USER_PRIVILEGES_QUERY, params, row_format='tuple'):
+            names = self.PRIVILEGE_TYPES[object_type]
+            if granted is None:  # superuser
+                privileges = dict.fromkeys(names, True)
+            else:
+                privileges = {privilege: privilege in granted for privilege in names}
+                # Yangi versiyalardagi qo'shimcha ruxsatlar (masalan PG17 MAINTAIN)
+                privileges.update((privilege, True) for privilege in granted if privilege not in privileges)
             
-            for row in cursor.fetchall():
-                privileges.append({
-                    'type': 'table',
-                    'schema': row['schemaname'],
-                    'name': row['tablename'],
-                    'privileges': {
-                        'select': row['can_select'],
-                        'insert': row['can_insert'],
-                        'update': row['can_update'],
-                        'delete': row['can_delete'],
-                        'truncate': row['can_truncate'],
-                        'references': row['can_reference'],
-                        'trigger': row['can_trigger']
-                    }
-                })
-        
-        return privileges
+            entry = {'username': username, 'type': object_type}
+            if schema is not None:
+                entry['schema'] = schema
+            entry['name'] = name
+            entry['privileges'] = privileges
+            yield entry
+    
+    def get_user_privileges(self, usernames: Union[str, Sequence[str]],
+                            object_types: Sequence[str] = None,
+                            include_denied: bool = False) -> List[Dict]:
+        """User(lar) ruxsatlarini olish (keshlanadi) - qatorlar iter_user_privileges dagidek"""
+        if isinstance(usernames, str):
+            usernames = [usernames]
+        # Kesh kaliti argumentlar tartibiga bog'liq bo'lmasin
+        return self._user_privileges(tuple(sorted(set(usernames))),
+                                     tuple(sorted(set(object_types))) if object_types else None,
+                                     bool(include_denied))
+    
+    @perf_monitor
+    @cache_result(tags=('privileges', 'roles'))
+    def _user_privileges(self, usernames: Tuple[str, ...],
+                         object_types: Optional[Tuple[str, ...]],
+                         include_denied: bool) -> List[Dict]:
+        return list(self.iter_user_privileges(usernames, object_types, include_denied))
     
     # ========================================================================
     # ROLES MANAGEMENT
     # ========================================================================
     
     @perf_monitor
+    @invalidates_cache('roles', 'privileges')
     def create_role(self, role_name: str, parent_role: str = None,
                    privileges: List[str] = None) -> bool:
         """Yangi rol yaratish"""
@@ -1087,6 +3232,7 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
+    @invalidates_cache('roles', 'privileges')
     def assign_role(self, username: str, role_name: str) -> bool:
         """Rol biriktirish"""
         try:
@@ -1099,6 +3245,7 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
+    @invalidates_cache('roles', 'privileges')
     def revoke_role(self, username: str, role_name: str) -> bool:
         """Rolni olib tashlash"""
         try:
@@ -1111,7 +3258,7 @@ class PostgreSQLManager:
             return False
     
     @perf_monitor
-    @cache_result(ttl=60)
+    @cache_result(tags=('roles',))
     def list_roles(self) -> List[Dict]:
         """Rollar ro'yxati"""
         query = """
@@ -1138,112 +3285,149 @@ class PostgreSQLManager:
     # MONITORING AND METRICS
     # ========================================================================
     
-    @perf_monitor
-    def get_metrics(self) -> Dict[str, Any]:
-        """PostgreSQL metrikalari"""
-        metrics = {}
+    # Barcha metrikalar bitta JSON hujjatda - bitta network round trip
+    METRICS_QUERY = """
+        SELECT json_build_object(
+            'connections', (
+                SELECT row_to_json(c) FROM (
+                    SELECT 
+                        count(*) as total_connections,
+                        count(*) FILTER (WHERE state = 'active') as active_connections,
+                        count(*) FILTER (WHERE state = 'idle') as idle_connections,
+                        count(*) FILTER (WHERE state = 'idle in transaction') as idle_in_transaction,
+                        count(*) FILTER (WHERE wait_event IS NOT NULL) as waiting_connections,
+                        count(DISTINCT datname) as active_databases,
+                        count(DISTINCT usename) as active_users,
+                        extract(epoch from max(age(now(), query_start)))::float8 as longest_query
+                    FROM pg_stat_activity
+                ) c
+            ),
+            'databases', (
+                SELECT row_to_json(d) FROM (
+                    SELECT 
+                        count(*) as database_count,
+                        pg_size_pretty(sum(pg_database_size(datname))) as total_size,
+                        sum(pg_database_size(datname)) as total_size_bytes
+                    FROM pg_database
+                    WHERE datistemplate = false
+                ) d
+            ),
+            'cache', (
+                SELECT row_to_json(h) FROM (
+                    SELECT 
+                        sum(heap_blks_hit)::float / nullif(sum(heap_blks_hit) + sum(heap_blks_read), 0) * 100 as cache_hit_ratio,
+                        sum(idx_blks_hit)::float / nullif(sum(idx_blks_hit) + sum(idx_blks_read), 0) * 100 as index_cache_ratio,
+                        sum(toast_blks_hit)::float / nullif(sum(toast_blks_hit) + sum(toast_blks_read), 0) * 100 as toast_cache_ratio
+                    FROM pg_statio_user_tables
+                ) h
+            ),
+            'indexes', (
+                SELECT row_to_json(i) FROM (
+                    SELECT 
+                        sum(idx_scan) as total_index_scans,
+                        sum(idx_tup_fetch) as total_index_fetches,
+                        (SELECT sum(idx_tup_read) FROM pg_stat_user_indexes) as total_index_reads,
+                        sum(idx_scan)::float / nullif(sum(idx_scan) + sum(seq_scan), 0) * 100 as index_usage_ratio
+                    FROM pg_stat_user_tables
+                ) i
+            ),
+            'locks', (
+                SELECT coalesce(json_agg(l), '[]'::json) FROM (
+                    SELECT 
+                        locktype,
+                        mode,
+                        count(*) as lock_count,
+                        count(DISTINCT relation) as locked_tables,
+                        count(DISTINCT pid) as waiting_pids
+                    FROM pg_locks
+                    WHERE granted = false
+                    GROUP BY locktype, mode
+                ) l
+            ),
+            'transactions', (
+                SELECT row_to_json(t) FROM (
+                    SELECT 
+                        xact_commit,
+                        xact_rollback,
+                        xact_commit + xact_rollback as total_transactions,
+                        xact_commit::float / nullif(xact_commit + xact_rollback, 0) * 100 as commit_ratio
+                    FROM pg_stat_database
+                    WHERE datname = current_database()
+                ) t
+            ),
+            'replication', (
+                SELECT row_to_json(r) FROM (
+                    SELECT 
+                        (SELECT count(*) FROM pg_replication_slots) as replication_slots,
+                        (SELECT count(*) FROM pg_replication_slots WHERE active) as active_slots,
+                        max(lag) as replication_lag_bytes,
+                        pg_size_pretty(max(lag)) as replication_lag
+                    FROM (
+                        SELECT CASE WHEN pg_is_in_recovery() THEN NULL
+                                    ELSE pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn) END as lag
+                        FROM pg_stat_replication
+                    ) s
+                ) r
+            ),
+            'bgwriter', (
+                -- PostgreSQL 17 da ba'zi ustunlar pg_stat_checkpointer ga ko'chgan - null qaytadi
+                SELECT json_build_object(
+                    'buffers_checkpoint', b->'buffers_checkpoint',
+                    'buffers_clean', b->'buffers_clean',
+                    'maxwritten_clean', b->'maxwritten_clean',
+                    'buffers_backend', b->'buffers_backend',
+                    'buffers_alloc', b->'buffers_alloc',
+                    'buffers_backend_fsync', b->'buffers_backend_fsync'
+                )
+                FROM (SELECT to_jsonb(w) as b FROM pg_stat_bgwriter w) bw
+            )
+        )
+    """
+    
+    # JSON da son bo'lib keladigan numeric ustunlar - alohida so'rovlardagi kabi Decimal
+    METRICS_DECIMAL_FIELDS = (
+        ('databases', 'total_size_bytes'),
+        ('indexes', 'total_index_scans'),
+        ('indexes', 'total_index_fetches'),
+        ('indexes', 'total_index_reads'),
+        ('replication', 'replication_lag_bytes'),
+    )
+    
+    @classmethod
+    def decode_metrics(cls, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """METRICS_QUERY natijasi - Decimal va timedelta turlarini tiklash"""
+        import decimal
         
-        with self.get_cursor() as cursor:
-            # Connections
-            cursor.execute("""
-                SELECT 
-                    count(*) as total_connections,
-                    count(*) FILTER (WHERE state = 'active') as active_connections,
-                    count(*) FILTER (WHERE state = 'idle') as idle_connections,
-                    count(*) FILTER (WHERE state = 'idle in transaction') as idle_in_transaction,
-                    count(*) FILTER (WHERE wait_event IS NOT NULL) as waiting_connections,
-                    count(DISTINCT datname) as active_databases,
-                    count(DISTINCT usename) as active_users,
-                    max(age(now(), query_start)) as longest_query
-                FROM pg_stat_activity
-            """)
-            metrics['connections'] = cursor.fetchone()
-            
-            # Database sizes
-            cursor.execute("""
-                SELECT 
-                    count(*) as database_count,
-                    pg_size_pretty(sum(pg_database_size(datname))) as total_size,
-                    sum(pg_database_size(datname)) as total_size_bytes
-                FROM pg_database
-                WHERE datistemplate = false
-            """)
-            metrics['databases'] = cursor.fetchone()
-            
-            # Cache hit ratio
-            cursor.execute("""
-                SELECT 
-                    sum(heap_blks_hit)::float / nullif(sum(heap_blks_hit) + sum(heap_blks_read), 0) * 100 as cache_hit_ratio,
-                    sum(idx_blks_hit)::float / nullif(sum(idx_blks_hit) + sum(idx_blks_read), 0) * 100 as index_cache_ratio,
-                    sum(toast_blks_hit)::float / nullif(sum(toast_blks_hit) + sum(toast_blks_read), 0) * 100 as toast_cache_ratio
-                FROM pg_statio_user_tables
-            """)
-            metrics['cache'] = cursor.fetchone()
-            
-            # Index usage
-            cursor.execute("""
-                SELECT 
-                    sum(idx_scan) as total_index_scans,
-                    sum(idx_tup_fetch) as total_index_fetches,
-                    sum(idx_tup_read) as total_index_reads,
-                    sum(idx_scan)::float / nullif(sum(idx_scan) + sum(seq_scan), 0) * 100 as index_usage_ratio
-                FROM pg_stat_user_tables
-            """)
-            metrics['indexes'] = cursor.fetchone()
-            
-            # Locks
-            cursor.execute("""
-                SELECT 
-                    locktype,
-                    mode,
-                    count(*) as lock_count,
-                    count(DISTINCT relation) as locked_tables,
-                    count(DISTINCT pid) as waiting_pids
-                FROM pg_locks
-                WHERE granted = false
-                GROUP BY locktype, mode
-            """)
-            metrics['locks'] = cursor.fetchall()
-            
-            # Transactions
-            cursor.execute("""
-                SELECT 
-                    xact_commit,
-                    xact_rollback,
-                    xact_commit + xact_rollback as total_transactions,
-                    xact_commit::float / nullif(xact_commit + xact_rollback, 0) * 100 as commit_ratio
-                FROM pg_stat_database
-                WHERE datname = current_database()
-            """)
-            metrics['transactions'] = cursor.fetchone()
-            
-            # Replication
-            cursor.execute("""
-                SELECT 
-                    count(*) as replication_slots,
-                    count(*) FILTER (WHERE active) as active_slots,
-                    pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn) as replication_lag_bytes,
-                    pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn)) as replication_lag
-                FROM pg_stat_replication
-            """)
-            metrics['replication'] = cursor.fetchone()
-            
-            # Background writer
-            cursor.execute("""
-                SELECT 
-                    buffers_checkpoint,
-                    buffers_clean,
-                    maxwritten_clean,
-                    buffers_backend,
-                    buffers_alloc,
-                    buffers_backend_fsync
-                FROM pg_stat_bgwriter
-            """)
-            metrics['bgwriter'] = cursor.fetchone()
+        for section, field in cls.METRICS_DECIMAL_FIELDS:
+            values = metrics.get(section)
+            if values and values.get(field) is not None:
+                values[field] = decimal.Decimal(values[field])
+        
+        connections = metrics.get('connections')
+        if connections and connections.get('longest_query') is not None:
+            connections['longest_query'] = datetime.timedelta(seconds=connections['longest_query'])
         
         metrics['timestamp'] = datetime.datetime.now().isoformat()
         return metrics
     
+    @perf_monitor
+    def get_metrics(self) -> Dict[str, Any]:
+        """PostgreSQL metrikalari - bitta so'rov, bitta round trip"""
+        with self.get_connection() as conn:
+            # autocommit: BEGIN/COMMIT uchun qo'shimcha round trip bo'lmaydi.
+            # Tranzaksiya ichidagi connection da autocommit ni o'zgartirib bo'lmaydi
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    self.statement_cache.execute(cursor, self.METRICS_QUERY)
+                    metrics = cursor.fetchone()[0]
+            finally:
+                conn.autocommit = False
+        
+        return self.decode_metrics(metrics)
+    
     @perf_monitor
     def get_slow_queries(self, threshold: float = None) -> List[Dict]:
         """Sekin querylarni olish"""
@@ -1268,8 +3452,8 @@ class PostgreSQLManager:
                 backend_type
             FROM pg_stat_activity
             WHERE state = 'active' 
-                AND query NOT LIKE '%pg_stat_activity%'
-                AND age(now(), query_start) > interval %s
+                AND query NOT LIKE '%%pg_stat_activity%%'
+                AND age(now(), query_start) > %s::interval
                 AND pid != pg_backend_pid()
             ORDER BY duration DESC
         """
@@ -1316,6 +3500,10 @@ class PostgreSQLManager:
     def backup_database(self, db_name: str, backup_type: str = 'full',
                        compress: bool = True) -> Optional[str]:
         """Database backup"""
+        import shutil
+        import subprocess
+        
+        config.ensure_dirs()
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_file = f"{config.BACKUP_DIR}/{db_name}_{timestamp}"
         
@@ -1393,6 +3581,9 @@ class PostgreSQLManager:
     @perf_monitor
     def restore_database(self, db_name: str, backup_file: str) -> bool:
         """Database restore"""
+        import shutil
+        import subprocess
+        
         if not os.path.exists(backup_file):
             logger.error(f"Backup file not found: {backup_file}")
             return False
@@ -1462,90 +3653,468 @@ class PostgreSQLManager:
     
     @perf_monitor
     def insert_data(self, table: str, data: Union[Dict, List[Dict]],
-                   batch_size: int = None) -> Tuple[int, int]:
-        """Ma'lumot qo'shish"""
+                   batch_size: int = None, method: str = None) -> Tuple[int, int]:
+        """Ma'lumot qo'shish (copy / values / executemany)"""
         if isinstance(data, dict):
             data = [data]
         
         if not data:
             return 0, 0
         
-        if batch_size is None:
-            batch_size = config.BATCH_SIZE
-        
-        successful = 0
-        failed = 0
-        
         columns = list(data[0].keys())
-        placeholders = ','.join(['%s'] * len(columns))
-        query = f"INSERT INTO {table} ({','.join(columns)}) VALUES ({placeholders})"
+        # Ustuni yetishmagan yozuv NULL bilan yozilmaydi - xato deb hisoblanadi
+        incomplete = 0
+        
+        def complete_rows():
+            nonlocal incomplete
+            for index, row in enumerate(data):
+                try:
+                    yield tuple(row[col] for col in columns)
+                except KeyError as e:
+                    incomplete += 1
+                    logger.error(f"Row {index} is missing column {e} - skipped")
         
         try:
-            with self.get_cursor() as cursor:
-                for i in range(0, len(data), batch_size):
-                    batch = data[i:i + batch_size]
-                    values = [tuple(row[col] for col in columns) for row in batch]
-                    
-                    try:
-                        cursor.executemany(query, values)
-                        successful += len(batch)
-                    except Exception as e:
-                        logger.error(f"Batch insert failed: {e}")
-                        failed += len(batch)
-            
+            successful, failed = self._bulk_insert(table, columns, complete_rows(),
+                                                   batch_size=batch_size, method=method)
+            failed += incomplete
             logger.success(f"📝 Inserted {successful} rows into {table}")
             return successful, failed
         except Exception as e:
             logger.error(f"Insert failed: {e}")
             return 0, len(data)
     
+    def _bulk_insert(self, table: str, columns: List[str], rows: Iterable[Sequence],
+                     batch_size: int = None, method: str = None,
+                     errors: List[str] = None) -> Tuple[int, int]:
+        """Qatorlarni batch larga bo'lib yozish - har bir batch o'z savepoint ida"""
+        method = (method or config.BULK_INSERT_METHOD).lower()
+        if method not in BULK_INSERT_METHODS:
+            raise ValueError(f"Unknown insert method: {method}")
+        
+        if batch_size is None:
+            batch_size = config.COPY_BATCH_SIZE if method == 'copy' else config.BATCH_SIZE
+        
+        successful = 0
+        failed = 0
+        
+        with self.get_cursor(cursor_factory=None) as cursor:
+            for batch in _chunked(rows, batch_size):
+                cursor.execute("SAVEPOINT pgu_bulk_batch")
+                try:
+                    self._write_batch(cursor, table, columns, batch, method)
+                    cursor.execute("RELEASE SAVEPOINT pgu_bulk_batch")
+                    successful += len(batch)
+                except psycopg2.Error as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT pgu_bulk_batch")
+                    logger.error(f"Batch insert failed: {e}")
+                    failed += len(batch)
+                    if errors is not None:
+                        errors.append(str(e).strip())
+        
+        return successful, failed
+    
+    def _write_batch(self, cursor, table: str, columns: List[str],
+                     batch: List[Sequence], method: str):
+        """Bitta batch ni tanlangan usulda yuborish"""
+        column_list = ','.join(columns)
+        
+        if method == 'copy':
+            # Butun batch bitta COPY FROM STDIN oqimida ketadi
+            buffer = io.StringIO()
+            buffer.writelines(_copy_row(row) for row in batch)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", buffer)
+        elif method == 'values':
+            psycopg2.extras.execute_values(
+                cursor,
+                f"INSERT INTO {table} ({column_list}) VALUES %s",
+                batch,
+                page_size=len(batch)
+            )
+        else:
+            placeholders = ','.join(['%s'] * len(columns))
+            cursor.executemany(
+                f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})",
+                batch
+            )
+    
+    @perf_monitor
+    def parallel_load(self, table: str, columns: List[str],
+                      chunks: Iterable[Tuple[Any, List[Sequence]]],
+                      workers: int = None, method: str = 'copy') -> Tuple[int, int]:
+        """Chunk larni bir nechta pool connection orqali parallel yuklash
+        
+        chunks - (chunk_id, qatorlar) juftliklari; chunk_id xatolik hisobotida
+        qaytariladi (masalan CSV uchun bayt offset). Har bir chunk alohida
+        tranzaksiyada commit qilinadi.
+        """
+        if workers is None:
+            workers = config.PARALLEL_WORKERS
+        workers = max(1, min(workers, config.POOL_MAX_SIZE))
+        
+        worker_stats: Dict[str, Dict[str, Any]] = {}
+        errors: List[Dict[str, Any]] = []
+        successful = 0
+        failed = 0
+        
+        def load(index: int, chunk_id: Any, rows: List[Sequence]):
+            chunk_errors: List[str] = []
+            start = time.perf_counter()
+            try:
+                ok, bad = self._bulk_insert(table, columns, rows, batch_size=len(rows),
+                                            method=method, errors=chunk_errors)
+            except Exception as e:
+                ok, bad = 0, len(rows)
+                chunk_errors.append(str(e).strip())
+            return (index, chunk_id, threading.current_thread().name, ok, bad,
+                    time.perf_counter() - start, chunk_errors)
+        
+        def collect(done):
+            nonlocal successful, failed
+            for future in done:
+                index, chunk_id, worker, ok, bad, seconds, chunk_errors = future.result()
+                successful += ok
+                failed += bad
+                
+                ws = worker_stats.setdefault(worker, {'chunks': 0, 'rows': 0, 'failed': 0, 'seconds': 0.0})
+                ws['chunks'] += 1
+                ws['rows'] += ok
+                ws['failed'] += bad
+                ws['seconds'] += seconds
+                
+                if bad:
+                    errors.append({
+                        'chunk': index,
+                        'chunk_id': chunk_id,
+                        'rows': bad,
+                        'error': '; '.join(chunk_errors) or 'batch failed'
+                    })
+        
+        import concurrent.futures
+        
+        start = time.perf_counter()
+        source_error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                   thread_name_prefix='pgu-loader') as executor:
+            pending = set()
+            try:
+                for index, (chunk_id, rows) in enumerate(chunks):
+                    # In-flight chunk lar soni cheklangan - xotira barqaror qoladi
+                    if len(pending) >= workers * 2:
+                        done, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(executor.submit(load, index, chunk_id, rows))
+            except Exception as e:
+                # Chunk manbasi xato berdi - boshlangan chunk lar baribir commit bo'ladi,
+                # ularni hisobga olish uchun tugashi kutiladi
+                source_error = e
+            collect(concurrent.futures.as_completed(pending))
+        
+        elapsed = time.perf_counter() - start
+        for ws in worker_stats.values():
+            ws['seconds'] = round(ws['seconds'], 3)
+            ws['rows_per_sec'] = round(ws['rows'] / ws['seconds'], 1) if ws['seconds'] > 0 else 0.0
+        
+        # Xatoliklar chunk tartibida
+        errors.sort(key=lambda e: e['chunk'])
+        for error in errors:
+            logger.error(f"Chunk {error['chunk']} ({error['chunk_id']}) failed: {error['error']}")
+        
+        self.last_load_stats = {
+            'table': table,
+            'workers': worker_stats,
+            'errors': errors,
+            'rows': successful,
+            'failed': failed,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(successful / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        if source_error is not None:
+            logger.error(f"Parallel load into {table} stopped after {successful} rows: {source_error}")
+            raise source_error
+        
+        logger.success(f"⚡ Parallel load: {successful} rows into {table} with {workers} workers "
+                       f"({self.last_load_stats['rows_per_sec']:,.0f} rows/s)")
+        return successful, failed
+    
+    def get_table_columns(self, table: str) -> List[Dict]:
+        """Jadval ustunlari va ularning turlari (pg_attribute dan)"""
+        query = """
+            SELECT 
+                a.attname as column_name,
+                format_type(a.atttypid, a.atttypmod) as data_type,
+                t.typcategory as category,
+                a.attnotnull as not_null
+            FROM pg_attribute a
+            JOIN pg_type t ON t.oid = a.atttypid
+            WHERE a.attrelid = to_regclass(%s)
+                AND a.attnum > 0
+                AND NOT a.attisdropped
+            ORDER BY a.attnum
+        """
+        
+        return self.execute_query(query, (table,)) or []
+    
     @perf_monitor
     def import_csv(self, table: str, csv_file: str, delimiter: str = ',',
-                  header: bool = True) -> Tuple[int, int]:
-        """CSV fayldan import"""
+                  header: bool = True, chunk_size: int = None,
+                  start_offset: int = 0, encoding: str = 'utf-8',
+                  workers: int = 1) -> Tuple[int, int]:
+        """CSV fayldan oqimli import - fayl hech qachon to'liq xotiraga olinmaydi"""
+        if chunk_size is None:
+            chunk_size = config.COPY_BATCH_SIZE
+        
+        stats = {
+            'file': csv_file,
+            'table': table,
+            'rows': 0,
+            'failed': 0,
+            'start_offset': start_offset,
+            'offset': start_offset,
+            'resume_offset': None
+        }
+        self.last_import_stats = stats
+        successful = 0
+        failed = 0
+        start = time.perf_counter()
+        
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                if header:
-                    reader = csv.DictReader(f, delimiter=delimiter)
-                    data = list(reader)
-                else:
-                    reader = csv.reader(f, delimiter=delimiter)
-                    headers = [f"column_{i}" for i in range(len(next(reader)))]
-                    f.seek(0)
-                    reader = csv.DictReader(f, fieldnames=headers, delimiter=delimiter)
-                    data = list(reader)
+            with open(csv_file, 'rb') as f:
+                columns, chunks = self._iter_csv_chunks(f, delimiter, header, chunk_size,
+                                                        start_offset, encoding)
+                categories = {c['column_name']: c['category'] for c in self.get_table_columns(table)}
+                convert = _compile_csv_converter(columns, categories)
                 
-                # Convert types
-                for row in data:
-                    for key, value in row.items():
-                        if value is not None and value != '':
-                            if value.lower() in ('true', 'false'):
-                                row[key] = value.lower() == 'true'
-                            elif value.replace('.', '').replace('-', '').isdigit():
-                                if '.' in value:
-                                    row[key] = float(value)
-                                else:
-                                    row[key] = int(value)
-                
-                return self.insert_data(table, data)
+                if workers > 1:
+                    # Parallel rejimda keyingi chunk lar allaqachon commit qilingan
+                    # bo'lishi mumkin - bitta resume_offset faqat undan keyin hech narsa
+                    # commit qilinmagan bo'lsa beriladi
+                    read_end = stats['offset']
+                    ranges = []
+                    
+                    def submitted():
+                        nonlocal read_end
+                        for chunk_start, chunk_end, rows in chunks:
+                            ranges.append((chunk_start, chunk_end))
+                            yield chunk_start, convert(rows) if convert else rows
+                            read_end = chunk_end
+                    
+                    self.last_load_stats = {}
+                    source_error = None
+                    try:
+                        successful, failed = self.parallel_load(table, columns, submitted(),
+                                                                workers=workers)
+                    except Exception as e:
+                        # O'qish xatosi - tugagan chunk lar parallel_load statistikasida
+                        source_error = e
+                        successful = self.last_load_stats.get('rows', 0)
+                        failed = self.last_load_stats.get('failed', 0)
+                    
+                    stats['workers'] = self.last_load_stats.get('workers', {})
+                    stats['errors'] = self.last_load_stats.get('errors', [])
+                    uncommitted = [error['chunk_id'] for error in stats['errors']]
+                    if source_error is not None:
+                        uncommitted.append(read_end)
+                    if uncommitted:
+                        first_gap = min(uncommitted)
+                        failed_starts = set(uncommitted)
+                        committed = [[chunk_start, chunk_end] for chunk_start, chunk_end in ranges
+                                     if chunk_start not in failed_starts]
+                        if any(chunk_start > first_gap for chunk_start, _ in committed):
+                            # Xatodan keyingi chunk lar commit bo'lgan - start_offset bilan
+                            # davom ettirish ularni ikkinchi marta qo'shadi
+                            stats['committed_ranges'] = committed
+                            stats['failed_ranges'] = [[chunk_start, chunk_end]
+                                                      for chunk_start, chunk_end in ranges
+                                                      if chunk_start in failed_starts]
+                            if source_error is not None:
+                                stats['failed_ranges'].append([read_end, None])
+                            logger.error("Parallel CSV import left committed chunks after a failed one - "
+                                         "no resume_offset; see committed_ranges / failed_ranges")
+                        else:
+                            stats['resume_offset'] = first_gap
+                    else:
+                        stats['offset'] = f.tell()
+                    if source_error is not None:
+                        raise source_error
+                else:
+                    # Har bir chunk alohida commit qilinadi - xatolikdan keyin
+                    # resume_offset dan davom ettirish mumkin
+                    for chunk_start, chunk_end, rows in chunks:
+                        if convert:
+                            rows = convert(rows)
+                        ok, bad = self._bulk_insert(table, columns, rows,
+                                                    batch_size=len(rows), method='copy')
+                        successful += ok
+                        failed += bad
+                        
+                        if bad:
+                            stats['resume_offset'] = chunk_start
+                            logger.error(f"CSV chunk at byte {chunk_start} failed - "
+                                         f"resume with start_offset={chunk_start}")
+                            break
+                        
+                        stats['offset'] = chunk_end
         except Exception as e:
-            logger.error(f"CSV import failed: {e}")
-            return 0, 0
+            if stats['resume_offset'] is None and 'committed_ranges' not in stats:
+                stats['resume_offset'] = stats['offset']
+            stats['error'] = str(e).strip()
+            logger.error(f"CSV import failed: {e} - resume with start_offset={stats['resume_offset']}")
+        
+        self._finish_import_stats(stats, successful, failed, start)
+        return successful, failed
+    
+    def _finish_import_stats(self, stats: Dict[str, Any], successful: int,
+                             failed: int, start: float):
+        """Import statistikasini yakunlash va log qilish"""
+        elapsed = time.perf_counter() - start
+        stats.update({
+            'rows': successful,
+            'failed': failed,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(successful / elapsed, 1) if elapsed > 0 else 0.0,
+            'peak_rss_mb': round(_peak_rss_mb(), 1)
+        })
+        summary = (f"{successful} rows into {stats['table']} "
+                   f"({stats['rows_per_sec']:,.0f} rows/s, peak RSS {stats['peak_rss_mb']} MB)")
+        if stats.get('resume_offset') is not None or stats.get('error') or stats.get('failed_ranges'):
+            logger.warning(f"📥 Import incomplete: {summary}, {failed} failed - "
+                           f"resume_offset={stats.get('resume_offset')}")
+        else:
+            logger.success(f"📥 Imported {summary}")
+    
+    def _iter_csv_chunks(self, f, delimiter: str, header: bool, chunk_size: int,
+                         start_offset: int, encoding: str) -> Tuple[List[str], Iterator]:
+        """CSV ni (boshlanish_offset, tugash_offset, qatorlar) chunk lariga bo'lish"""
+        # Fayl baytlar bo'yicha b'\n' da bo'linadi va har bir qator alohida decode
+        # qilinadi - bu faqat ASCII bilan mos kodirovkalarda to'g'ri (utf-16/32 emas)
+        encoder = codecs.getincrementalencoder(encoding)()
+        encoder.encode('a')  # BOM (utf-8-sig) birinchi chaqiruvda chiqadi
+        if encoder.encode('\n\r"') != b'\n\r"':
+            raise ValueError(f"Encoding {encoding!r} is not ASCII-compatible - "
+                             f"convert the file to UTF-8 before importing")
+        
+        def records(position: int):
+            f.seek(position)
+            # readline binary rejimda tell() ni aniq saqlaydi, csv.reader esa
+            # oldindan o'qimaydi - shuning uchun offset har doim yozuv chegarasida
+            # Bo'sh qatorlar (masalan fayl oxiridagi) yozuv hisoblanmaydi
+            lines = (line.decode(encoding) for line in iter(f.readline, b''))
+            return (row for row in csv.reader(lines, delimiter=delimiter) if row)
+        
+        if header:
+            columns = next(records(0), None)
+            if not columns:
+                return [], iter(())
+            if start_offset < f.tell():
+                start_offset = f.tell()
+        else:
+            first = next(records(start_offset), None)
+            if not first:
+                return [], iter(())
+            columns = [f"column_{i}" for i in range(len(first))]
+        
+        def chunks():
+            reader = records(start_offset)
+            while True:
+                chunk_start = f.tell()
+                rows = list(itertools.islice(reader, chunk_size))
+                if not rows:
+                    return
+                yield chunk_start, f.tell(), rows
+        
+        return columns, chunks()
     
     @perf_monitor
-    def import_json(self, table: str, json_file: str) -> Tuple[int, int]:
-        """JSON fayldan import"""
+    def import_json(self, table: str, json_file: str, batch_size: int = None,
+                   json_format: str = 'auto', workers: int = 1) -> Tuple[int, int]:
+        """JSON / NDJSON fayldan oqimli import (auto | ndjson | array | object)"""
+        if batch_size is None:
+            batch_size = config.COPY_BATCH_SIZE
+        
+        stats = {'file': json_file, 'table': table, 'format': json_format}
+        self.last_import_stats = stats
+        successful = 0
+        failed = 0
+        start = time.perf_counter()
+        
         try:
             with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                if json_format == 'auto':
+                    json_format = _detect_json_format(f, json_file)
+                stats['format'] = json_format
+                
+                if json_format == 'ndjson':
+                    batches = _iter_ndjson_batches(f, batch_size)
+                elif json_format == 'array':
+                    batches = _chunked(_iter_json_array(f), batch_size)
+                else:
+                    batches = iter([[json.load(f)]])
+                
+                columns: List[str] = []
+                stats['mismatched_keys'] = 0
                 
-                if isinstance(data, dict):
-                    data = [data]
+                def row_batches():
+                    nonlocal failed
+                    expected = None
+                    for index, batch in enumerate(batches):
+                        records = [record for record in batch if isinstance(record, dict)]
+                        failed += len(batch) - len(records)
+                        if not records:
+                            continue
+                        
+                        if not columns:
+                            columns.extend(records[0].keys())
+                            expected = set(columns)
+                        
+                        # Kalitlari birinchi yozuvdan farq qiladigan yozuvlar rad etiladi -
+                        # yetishmagan ustun NULL bo'lmaydi, ortiqchasi jimgina tashlanmaydi
+                        rows = [tuple(record[col] for col in columns) for record in records
+                                if record.keys() == expected]
+                        mismatched = len(records) - len(rows)
+                        if mismatched:
+                            failed += mismatched
+                            stats['mismatched_keys'] += mismatched
+                        if rows:
+                            yield index, rows
                 
-                return self.insert_data(table, data)
+                if workers > 1:
+                    batches_iter = row_batches()
+                    first = next(batches_iter, None)
+                    if first:
+                        self.last_load_stats = {}
+                        try:
+                            ok, bad = self.parallel_load(table, columns,
+                                                         itertools.chain([first], batches_iter),
+                                                         workers=workers)
+                        except Exception:
+                            # Decode xatosi - tugagan batch lar commit qilingan, hisobga olinadi
+                            successful += self.last_load_stats.get('rows', 0)
+                            failed += self.last_load_stats.get('failed', 0)
+                            raise
+                        else:
+                            successful += ok
+                            failed += bad
+                        finally:
+                            stats['workers'] = self.last_load_stats.get('workers', {})
+                            stats['errors'] = self.last_load_stats.get('errors', [])
+                else:
+                    for _, rows in row_batches():
+                        ok, bad = self._bulk_insert(table, columns, rows,
+                                                    batch_size=len(rows), method='copy')
+                        successful += ok
+                        failed += bad
         except Exception as e:
+            stats['error'] = str(e).strip()
             logger.error(f"JSON import failed: {e}")
-            return 0, 0
+        
+        if stats.get('mismatched_keys'):
+            logger.warning(f"{stats['mismatched_keys']} JSON records rejected: keys differ from the "
+                           f"first record ({', '.join(columns)})")
+        self._finish_import_stats(stats, successful, failed, start)
+        return successful, failed
     
     # ========================================================================
     # MONITORING THREAD
@@ -1564,6 +4133,8 @@ class PostgreSQLManager:
         self.monitoring_active = False
         if self.monitor_thread:
             self.monitor_thread.join()
+        if self.timeseries:
+            self.timeseries.flush()
         logger.info("📊 Monitoring stopped")
     
     def _monitoring_loop(self):
@@ -1571,73 +4142,332 @@ class PostgreSQLManager:
         while self.monitoring_active:
             try:
                 metrics = self.get_metrics()
-                self.metrics_history.append({
-                    'timestamp': datetime.datetime.now(),
-                    'metrics': metrics
-                })
+                self.last_metrics = metrics
                 
-                # Clean old metrics
-                cutoff = datetime.datetime.now() - datetime.timedelta(days=config.METRICS_RETENTION_DAYS)
-                self.metrics_history = [
-                    m for m in self.metrics_history 
-                    if m['timestamp'] > cutoff
-                ]
+                # Ring buffer eski namunalarni o'zi tashlaydi
+                timestamp, sample = time.time(), metrics_sample(metrics)
+                self.metrics_history.append(timestamp, sample)
+                if self.timeseries:
+                    self.timeseries.append(timestamp, sample)
                 
                 # Check alerts
                 self._check_alerts(metrics)
-                
-                time.sleep(config.MONITOR_INTERVAL)
             except Exception as e:
                 logger.error(f"Monitoring error: {e}")
+            
+            time.sleep(config.MONITOR_INTERVAL)
     
-    def _check_alerts(self, metrics: Dict[str, Any]):
-        """Alert larni tekshirish"""
-        now = datetime.datetime.now()
-        
-        # Connection alerts
-        if metrics['connections']['total_connections'] > config.ALERT_THRESHOLD_CONNECTIONS:
-            self.alerts.append({
-                'timestamp': now,
-                'level': AlertLevel.WARNING,
-                'type': 'connections',
-                'message': f"High connections: {metrics['connections']['total_connections']}",
-                'value': metrics['connections']['total_connections'],
-                'threshold': config.ALERT_THRESHOLD_CONNECTIONS
-            })
-        
-        # Cache hit ratio alerts
-        if metrics['cache'] and metrics['cache']['cache_hit_ratio'] < 95:
-            self.alerts.append({
-                'timestamp': now,
-                'level': AlertLevel.WARNING,
-                'type': 'cache',
-                'message': f"Low cache hit ratio: {metrics['cache']['cache_hit_ratio']:.1f}%",
-                'value': metrics['cache']['cache_hit_ratio'],
-                'threshold': 95
-            })
-        
-        # Slow queries alerts
-        slow_queries = self.get_slow_queries(threshold=5.0)
-        if slow_queries:
-            self.alerts.append({
-                'timestamp': now,
-                'level': AlertLevel.WARNING,
-                'type': 'slow_queries',
-                'message': f"Slow queries detected: {len(slow_queries)}",
-                'value': len(slow_queries),
-                'threshold': 0
-            })
+    def _check_alerts(self, metrics: Dict[str, Any], slow_queries: int = None) -> List[Dict]:
+        """Alert larni tekshirish - yangi alert lar qaytariladi"""
+        if slow_queries is None:
+            slow_queries = len(self.get_slow_queries(threshold=config.ALERT_SLOW_QUERY_SECONDS))
+        new_alerts = evaluate_alerts(metrics, slow_queries)
+        
+        self.alerts.extend(new_alerts)
+        if new_alerts and config.REGISTRY_BACKEND == 'sqlite':
+            get_registry().add_alerts(self.deployment_name, new_alerts)
         
         # Keep only last 100 alerts
         if len(self.alerts) > 100:
             self.alerts = self.alerts[-100:]
+        
+        return new_alerts
     
     def close(self):
         """Resurslarni tozalash"""
+        self.statement_cache.invalidate()
         if self.connection_pool:
             self.connection_pool.closeall()
             logger.info("🔌 Connection pool closed")
 
+# ============================================================================
+# ASYNC MANAGER - ASYNCIO API
+# ============================================================================
+
+async def _async_wait(conn):
+    """psycopg2 async connection tayyor bo'lguncha event loop da kutish"""
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        if state == psycopg2.extensions.POLL_READ:
+            add, remove = loop.add_reader, loop.remove_reader
+        elif state == psycopg2.extensions.POLL_WRITE:
+            add, remove = loop.add_writer, loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"Unexpected poll() state: {state}")
+        
+        # Ulanish paytida libpq socket ni almashtirishi mumkin - fd har safar qayta olinadi
+        fd = conn.fileno()
+        ready = loop.create_future()
+        add(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            remove(fd)
+
+class AsyncConnectionPool:
+    """psycopg2 async ulanishlar pooli (asyncio)
+    
+    Bo'sh ulanishlar LIFO ro'yxatda, umumiy soni semafor bilan max_size da
+    cheklanadi - to'lganda acquire() navbat kutadi. So'rov o'rtasida qolgan
+    (bekor qilingan) yoki yopilgan ulanish pool ga qaytmaydi.
+    """
+    
+    def __init__(self, params: Dict[str, Any], min_size: int = None, max_size: int = None):
+        self.params = params
+        self.min_size = config.POOL_MIN_SIZE if min_size is None else min_size
+        self.max_size = max_size or config.POOL_MAX_SIZE
+        self._idle: List[Any] = []
+        self._slots = None
+        self._in_use = 0
+        self._closed = False
+    
+    def _semaphore(self):
+        import asyncio
+        
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+        return self._slots
+    
+    async def _connect(self):
+        conn = psycopg2.connect(async_=1, **self.params)
+        try:
+            await _async_wait(conn)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+    
+    async def open(self):
+        """min_size ta ulanishni oldindan ochish"""
+        import asyncio
+        
+        missing = min(self.min_size, self.max_size) - len(self._idle)
+        if missing > 0:
+            self._idle.extend(await asyncio.gather(*(self._connect() for _ in range(missing))))
+            logger.success(f"🔄 Async connection pool opened: {self.min_size}-{self.max_size}")
+    
+    async def acquire(self):
+        """Bo'sh ulanish yoki yangisi"""
+        if self._closed:
+            raise psycopg2.InterfaceError("Connection pool is closed")
+        
+        await self._semaphore().acquire()
+        try:
+            conn = None
+            while self._idle and conn is None:
+                conn = self._idle.pop()
+                if conn.closed:
+                    conn = None
+            if conn is None:
+                conn = await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._in_use += 1
+        return conn
+    
+    def release(self, conn):
+        """Ulanishni qaytarish - faqat toza (IDLE) holatdagisi qayta ishlatiladi"""
+        try:
+            reusable = (not self._closed and not conn.closed and
+                        conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+            if reusable:
+                self._idle.append(conn)
+            elif not conn.closed:
+                conn.close()
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+    
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    async def close(self):
+        """Pool ni yopish - ishlatilayotgan ulanishlar qaytarilganda yopiladi"""
+        self._closed = True
+        while self._idle:
+            self._idle.pop().close()
+    
+    def stats(self) -> Dict[str, int]:
+        return {'idle': len(self._idle), 'in_use': self._in_use, 'max_size': self.max_size}
+
+class AsyncSession:
+    """Bitta async ulanish ustidagi so'rovlar (AsyncPostgreSQLManager.transaction ichida)"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    async def _execute(self, query: str, params: Union[tuple, dict] = None):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            await _async_wait(self.conn)
+        except BaseException:
+            cursor.close()
+            raise
+        return cursor
+    
+    async def execute_query(self, query: str, params: Union[tuple, dict] = None,
+                            fetch: bool = True, row_format: str = 'dict') -> Any:
+        """Query bajarish (row_format: dict | tuple | record | columns)"""
+        cursor = await self._execute(query, params)
+        try:
+            if fetch and cursor.description:
+                return _shape_rows([d[0] for d in cursor.description], cursor.fetchall(), row_format)
+            return None
+        finally:
+            cursor.close()
+    
+    async def execute_many(self, query: str, params_list: Iterable[Union[tuple, dict]]) -> int:
+        """Bir xil query ni ko'p parametr bilan (har biri alohida round trip)"""
+        count = 0
+        for params in params_list:
+            cursor = await self._execute(query, params)
+            count += max(cursor.rowcount, 0)
+            cursor.close()
+        return count
+    
+    async def iter_query(self, query: str, params: Union[tuple, dict] = None, itersize: int = None,
+                         batch_size: int = None, row_format: str = 'dict') -> AsyncIterator:
+        """Server-side cursor (DECLARE/FETCH) orqali oqimli o'qish - tranzaksiya ichida
+        
+        Async rejimda named cursor yo'q, shuning uchun DECLARE qo'lda bajariladi.
+        batch_size berilsa qatorlar batch ko'rinishida qaytadi ('columns' doim batch).
+        """
+        if itersize is None:
+            itersize = config.STREAM_ITERSIZE
+        if row_format == 'columns' and not batch_size:
+            batch_size = itersize
+        fetch_size = batch_size or itersize
+        name = f"pgu_stream_{os.urandom(8).hex()}"
+        
+        cursor = await self._execute(f"DECLARE {name} NO SCROLL CURSOR FOR {query}", params)
+        cursor.close()
+        make = None
+        while True:
+            cursor = await self._execute(f"FETCH FORWARD {fetch_size} FROM {name}")
+            try:
+                columns = [d[0] for d in cursor.description]
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+            if not rows:
+                break
+            
+            if batch_size:
+                yield _shape_rows(columns, rows, row_format)
+            elif row_format == 'dict':
+                for row in rows:
+                    yield dict(zip(columns, row))
+            elif row_format == 'record':
+                make = make or _record_class(tuple(columns))._make
+                for row in rows:
+                    yield make(row)
+            else:
+                for row in rows:
+                    yield row
+            
+            if len(rows) < fetch_size:
+                break
+        
+        cursor = await self._execute(f"CLOSE {name}")
+        cursor.close()
+
+class AsyncPostgreSQLManager:
+    """PostgreSQLManager ning asyncio varianti - event loop ni bloklamaydi
+    
+    psycopg2 async rejimi va o'z AsyncConnectionPool i ustida ishlaydi;
+    aiohttp/FastAPI servislariga ichki joylashtirish uchun:
+    
+        async with AsyncPostgreSQLManager(url) as db:
+            rows = await db.execute_query("SELECT ...", (1,))
+            async for row in db.iter_query("SELECT ..."):
+                ...
+            async with db.transaction() as tx:
+                await tx.execute_query("UPDATE ...", fetch=False)
+    """
+    
+    def __init__(self, database_url: DatabaseURL, min_size: int = None, max_size: int = None):
+        self.database_url = database_url
+        params = database_url.get_connection_params()
+        params['application_name'] = 'PostgreSQL_Ultimate'
+        self.pool = AsyncConnectionPool(params, min_size=min_size, max_size=max_size)
+    
+    async def __aenter__(self) -> 'AsyncPostgreSQLManager':
+        await self.pool.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def execute_query(self, query: str, params: Union[tuple, dict] = None,
+                            fetch: bool = True, row_format: str = 'dict') -> Any:
+        """Query bajarish (autocommit)"""
+        start_time = time.time()
+        try:
+            async with self.pool.connection() as conn:
+                result = await AsyncSession(conn).execute_query(query, params, fetch, row_format)
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise
+        
+        duration = time.time() - start_time
+        if duration > config.SLOW_QUERY_THRESHOLD:
+            logger.warning(f"🐌 Slow query ({duration:.2f}s): {query[:100]}...")
+        return result
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """BEGIN ... COMMIT; xatoda (yoki bekor qilinganda) ROLLBACK"""
+        async with self.pool.connection() as conn:
+            session = AsyncSession(conn)
+            await session.execute_query("BEGIN", fetch=False)
+            try:
+                yield session
+            except BaseException:
+                # So'rov o'rtasida bekor qilingan ulanishga ROLLBACK yuborib bo'lmaydi - pool uni yopadi
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_ACTIVE:
+                    try:
+                        await session.execute_query("ROLLBACK", fetch=False)
+                    except psycopg2.Error:
+                        conn.close()
+                raise
+            await session.execute_query("COMMIT", fetch=False)
+    
+    async def execute_many(self, query: str, params_list: Iterable[Union[tuple, dict]]) -> int:
+        """Bitta tranzaksiyada ko'p qator"""
+        async with self.transaction() as session:
+            return await session.execute_many(query, params_list)
+    
+    async def iter_query(self, query: str, params: Union[tuple, dict] = None, itersize: int = None,
+                         batch_size: int = None, row_format: str = 'dict') -> AsyncIterator:
+        """Katta natijani oqimli o'qish - xotira natija hajmiga bog'liq emas
+        
+        Sikldan erta chiqilsa ulanish darhol qaytishi uchun contextlib.aclosing() bilan o'rang.
+        """
+        async with self.transaction() as session:
+            async for item in session.iter_query(query, params, itersize=itersize,
+                                                 batch_size=batch_size, row_format=row_format):
+                yield item
+    
+    async def get_metrics(self) -> Dict[str, Any]:
+        """PostgreSQL metrikalari - bitta so'rov, bitta round trip"""
+        rows = await self.execute_query(PostgreSQLManager.METRICS_QUERY, row_format='tuple')
+        return PostgreSQLManager.decode_metrics(rows[0][0])
+    
+    async def close(self):
+        await self.pool.close()
+
 # ============================================================================
 # DEPLOYMENT MANAGER
 # ============================================================================
@@ -1647,25 +4477,89 @@ class DeploymentManager:
     
     def __init__(self):
         self.deployments: Dict[str, Dict[str, Any]] = {}
-        self.load_deployments()
+        self.timeseries: Dict[str, MetricsTimeSeriesStore] = {}
+        self.metric_logs: Dict[str, MetricsLog] = {}
+        self.store: Optional[JsonFileStore] = None
+        self.registry: Optional[SQLiteRegistry] = None
+        
+        if config.REGISTRY_BACKEND == 'sqlite':
+            # Eski metrikalar migrate_from_json da ko'chiriladi
+            self.registry = get_registry()
+            self.deployments = RegistryView(self.registry, 'deployments', dict, self._dump)
+        else:
+            self.store = JsonFileStore(config.DEPLOYMENTS_FILE)
+            self.load_deployments()
+        atexit.register(self.flush_metrics)
+    
+    @staticmethod
+    def _dump(deployment: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Registry uchun: data va indekslangan ustunlar"""
+        return deployment, {
+            'environment': deployment.get('environment'),
+            'url_name': deployment.get('url_name'),
+            'status': deployment.get('status')
+        }
+    
+    def _save(self, name: str, deployment: Dict[str, Any]):
+        self.deployments[name] = deployment
+        if self.store:
+            self.store.set(name, deployment)
     
     @perf_monitor
     def load_deployments(self):
         """Deployment larni yuklash"""
-        if os.path.exists(config.DEPLOYMENTS_FILE):
-            try:
-                with open(config.DEPLOYMENTS_FILE, 'r', encoding='utf-8') as f:
-                    self.deployments = json.load(f)
+        try:
+            self.deployments = self.store.load()
+            if self.deployments:
                 logger.success(f"📦 Loaded {len(self.deployments)} deployments")
-            except Exception as e:
-                logger.error(f"Failed to load deployments: {e}")
+        except Exception as e:
+            logger.error(f"Failed to load deployments: {e}")
+            return
+        
+        self._migrate_metrics()
+    
+    def refresh(self):
+        """Boshqa jarayon yozgan o'zgarishlarni olish (faqat o'zgargan kalitlar)"""
+        if not self.store:
+            return
+        try:
+            changed, removed = self.store.reload()
+        except Exception as e:
+            logger.error(f"Failed to reload deployments: {e}")
+            return
+        
+        for name in removed:
+            self.deployments.pop(name, None)
+        for name in changed:
+            self.deployments[name] = self.store.get(name)
+    
+    def batch(self):
+        """Ko'p o'zgarishni bitta yozuvda saqlash: with manager.batch(): ..."""
+        return self.registry.transaction() if self.registry else self.store.batch()
+    
+    def _migrate_metrics(self):
+        """Eski formatdagi 'metrics' ro'yxatlarini alohida loglarga ko'chirish"""
+        migrated = 0
+        for name, deployment in self.deployments.items():
+            entries = deployment.pop('metrics', None)
+            if entries is None:
+                continue
+            if entries:
+                self.get_metrics_log(name).extend(entries)
+            self.store.set(name, deployment)
+            migrated += 1
+        
+        if migrated:
+            self.store.flush()
+            logger.info(f"📦 Moved metrics of {migrated} deployments to {config.METRICS_DIR}")
     
     @perf_monitor
     def save_deployments(self):
         """Deployment larni saqlash"""
         try:
-            with open(config.DEPLOYMENTS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.deployments, f, indent=2, ensure_ascii=False)
+            with self.batch():
+                for name, deployment in self.deployments.items():
+                    self._save(name, deployment)
             logger.success("💾 Deployments saved")
         except Exception as e:
             logger.error(f"Failed to save deployments: {e}")
@@ -1680,7 +4574,7 @@ class DeploymentManager:
             logger.warning(f"Deployment '{name}' already exists")
             return False
         
-        self.deployments[name] = {
+        self._save(name, {
             'name': name,
             'url_name': url_name,
             'environment': environment.value,
@@ -1689,16 +4583,15 @@ class DeploymentManager:
             'created_at': datetime.datetime.now().isoformat(),
             'updated_at': datetime.datetime.now().isoformat(),
             'status': 'created',
-            'config': kwargs,
-            'metrics': []
-        }
+            'config': kwargs
+        })
         
-        self.save_deployments()
         logger.success(f"🚀 Deployment created: {name}")
         return True
     
     def get_deployment(self, name: str) -> Optional[Dict]:
         """Deployment olish"""
+        self.refresh()
         return self.deployments.get(name)
     
     def remove_deployment(self, name: str) -> bool:
@@ -1708,40 +4601,324 @@ class DeploymentManager:
             return False
         
         del self.deployments[name]
-        self.save_deployments()
+        store = self.timeseries.pop(name, None)
+        if store:
+            store.close()
+        self.get_metrics_log(name).remove()
+        self.metric_logs.pop(name, None)
+        if self.store:
+            self.store.delete(name)
         logger.success(f"🗑️ Deployment removed: {name}")
         return True
     
     def update_deployment_status(self, name: str, status: str):
         """Deployment status yangilash"""
-        if name in self.deployments:
-            self.deployments[name]['status'] = status
-            self.deployments[name]['updated_at'] = datetime.datetime.now().isoformat()
-            self.save_deployments()
+        deployment = self.deployments.get(name)
+        if deployment:
+            deployment['status'] = status
+            deployment['updated_at'] = datetime.datetime.now().isoformat()
+            self._save(name, deployment)
+    
+    def get_timeseries(self, name: str) -> MetricsTimeSeriesStore:
+        """Deployment time-series fayli (lazy ochiladi)"""
+        store = self.timeseries.get(name)
+        if store is None:
+            store = self.timeseries[name] = MetricsTimeSeriesStore.for_deployment(name)
+        return store
+    
+    def get_metrics_log(self, name: str) -> MetricsLog:
+        """Deployment metrikalar logi (lazy ochiladi)"""
+        log = self.metric_logs.get(name)
+        if log is None:
+            log = self.metric_logs[name] = MetricsLog.for_deployment(name)
+        return log
     
     def add_metrics(self, name: str, metrics: Dict):
         """Metrika qo'shish"""
         if name in self.deployments:
-            self.deployments[name]['metrics'].append({
-                'timestamp': datetime.datetime.now().isoformat(),
-                'metrics': metrics
-            })
-            
-            # Keep only last 1000 metrics
-            if len(self.deployments[name]['metrics']) > 1000:
-                self.deployments[name]['metrics'] = self.deployments[name]['metrics'][-1000:]
-            
-            self.save_deployments()
+            self.get_timeseries(name).append(time.time(), metrics_sample(metrics))
+            self.get_metrics_log(name).append(metrics)
+    
+    def get_metrics(self, name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oxirgi metrikalar"""
+        if name not in self.deployments:
+            return []
+        return self.get_metrics_log(name).tail(limit)
+    
+    def flush_metrics(self):
+        """Bufferlangan metrikalarni diskka yozish"""
+        for log in list(self.metric_logs.values()):
+            log.flush()
+        for store in list(self.timeseries.values()):
+            store.flush()
     
     def list_deployments(self) -> List[Tuple[str, Dict]]:
         """Deployment lar ro'yxati"""
+        self.refresh()
         return list(self.deployments.items())
     
     def list_by_environment(self, environment: EnvironmentType) -> List[Dict]:
         """Muhit bo'yicha deployment lar"""
+        if self.registry:
+            return self.registry.deployments_by_environment(environment.value)
+        
+        self.refresh()
         env_value = environment.value
         return [d for d in self.deployments.values() if d['environment'] == env_value]
 
+# ============================================================================
+# ASYNC POLLER - MULTI-DEPLOYMENT MONITORING
+# ============================================================================
+
+def evaluate_alerts(metrics: Dict[str, Any], slow_queries: int) -> List[Dict]:
+    """Metrikalar bo'yicha alert lar (DB ga murojaat qilmaydi)"""
+    now = datetime.datetime.now()
+    new_alerts = []
+    
+    # Connection alerts
+    if metrics['connections']['total_connections'] > config.ALERT_THRESHOLD_CONNECTIONS:
+        new_alerts.append({
+            'timestamp': now,
+            'level': AlertLevel.WARNING,
+            'type': 'connections',
+            'message': f"High connections: {metrics['connections']['total_connections']}",
+            'value': metrics['connections']['total_connections'],
+            'threshold': config.ALERT_THRESHOLD_CONNECTIONS
+        })
+    
+    # Cache hit ratio alerts (user table lari bo'lmasa ratio null)
+    cache_hit_ratio = (metrics.get('cache') or {}).get('cache_hit_ratio')
+    if cache_hit_ratio is not None and cache_hit_ratio < 95:
+        new_alerts.append({
+            'timestamp': now,
+            'level': AlertLevel.WARNING,
+            'type': 'cache',
+            'message': f"Low cache hit ratio: {cache_hit_ratio:.1f}%",
+            'value': cache_hit_ratio,
+            'threshold': 95
+        })
+    
+    # Slow queries alerts
+    if slow_queries:
+        new_alerts.append({
+            'timestamp': now,
+            'level': AlertLevel.WARNING,
+            'type': 'slow_queries',
+            'message': f"Slow queries detected: {slow_queries}",
+            'value': slow_queries,
+            'threshold': 0
+        })
+    
+    return new_alerts
+
+@dataclass
+class PollTarget:
+    """Poller kuzatayotgan bitta deployment"""
+    name: str
+    params: Dict[str, Any]
+    interval: float
+    timeout: float
+    conn: Any = field(default=None, repr=False)
+    task: Any = field(default=None, repr=False)
+    failures: int = 0
+    samples: int = 0
+    last_sample: Optional[float] = None
+    last_error: Optional[str] = None
+
+class AsyncMetricsPoller:
+    """Barcha deployment larni bitta event loop da kuzatish (psycopg2 async rejimi)
+    
+    Har bir target uchun thread emas, bitta korutina va bitta ulanish; bir vaqtdagi
+    so'rovlar POLLER_CONCURRENCY semafori bilan cheklanadi. Xotirada faqat target
+    holati qoladi - namunalar on_sample(name, metrics, slow_queries) ga umumiy
+    thread pool da beriladi (bitta target uchun ketma-ket).
+    """
+    
+    # Metrikalar va sekin querylar soni - bitta round trip
+    POLL_QUERY = f"""
+        SELECT
+            ({PostgreSQLManager.METRICS_QUERY}),
+            (SELECT count(*) FROM pg_stat_activity
+             WHERE state = 'active'
+                AND query NOT LIKE '%%pg_stat_activity%%'
+                AND age(now(), query_start) > %s::interval
+                AND pid != pg_backend_pid())
+    """
+    
+    def __init__(self, on_sample: Callable[[str, Dict[str, Any], int], None],
+                 concurrency: int = None):
+        self.on_sample = on_sample
+        self.concurrency = concurrency or config.POLLER_CONCURRENCY
+        self.targets: Dict[str, PollTarget] = {}
+        self._loop = None
+        self._thread_id = None
+        self._semaphore = None
+        self._stopping = None
+        self._stop_requested = False
+    
+    def _call(self, func: Callable, *args):
+        """func ni event loop thread ida bajarish (boshqa thread dan ham xavfsiz)"""
+        loop = self._loop
+        if loop is None or self._thread_id == threading.get_ident():
+            func(*args)
+        else:
+            loop.call_soon_threadsafe(func, *args)
+    
+    def add_target(self, name: str, database_url: DatabaseURL,
+                   interval: float = None, timeout: float = None):
+        """Target qo'shish yoki yangilash"""
+        target = PollTarget(
+            name=name,
+            params=database_url.get_connection_params(),
+            interval=float(interval or config.MONITOR_INTERVAL),
+            timeout=float(timeout or config.POLLER_TIMEOUT)
+        )
+        self._call(self._add, target)
+    
+    def remove_target(self, name: str):
+        """Target ni olib tashlash - ulanish task tugaganda yopiladi"""
+        self._call(self._remove, name)
+    
+    def _add(self, target: PollTarget):
+        current = self.targets.get(target.name)
+        if current:
+            if (current.params, current.interval, current.timeout) == \
+                    (target.params, target.interval, target.timeout):
+                return
+            self._remove(target.name)
+        
+        self.targets[target.name] = target
+        if self._loop is not None:
+            target.task = self._loop.create_task(self._poll_target(target))
+    
+    def _remove(self, name: str):
+        target = self.targets.pop(name, None)
+        if target and target.task:
+            target.task.cancel()
+    
+    def stop(self):
+        """Yangi namunalarni to'xtatish - boshlanganlari tugashi kutiladi"""
+        self._stop_requested = True
+        if self._loop is not None:
+            self._call(self._stopping.set)
+    
+    async def run(self, drain_timeout: float = None):
+        """stop() gacha ishlaydi"""
+        import asyncio
+        
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self._thread_id = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        if self._stop_requested:
+            self._stopping.set()
+        
+        for target in self.targets.values():
+            target.task = self._loop.create_task(self._poll_target(target))
+        
+        try:
+            await self._stopping.wait()
+            tasks = [target.task for target in self.targets.values() if target.task]
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=drain_timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._loop = None
+            for target in self.targets.values():
+                self._close(target)
+    
+    async def _sleep(self, delay: float) -> bool:
+        """delay sekund kutish; stop() chaqirilsa False"""
+        import asyncio
+        
+        if self._stopping.is_set():
+            return False
+        try:
+            await asyncio.wait_for(self._stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            return True
+        return False
+    
+    @staticmethod
+    def _close(target: PollTarget):
+        if target.conn is not None:
+            target.conn.close()
+            target.conn = None
+    
+    async def _sample(self, target: PollTarget) -> Tuple[Dict[str, Any], int]:
+        """Bitta namuna - kerak bo'lsa avval ulanadi"""
+        if target.conn is None or target.conn.closed:
+            conn = psycopg2.connect(async_=1, **target.params)
+            try:
+                await _async_wait(conn)
+            except BaseException:
+                conn.close()
+                raise
+            target.conn = conn
+        
+        cursor = target.conn.cursor()
+        try:
+            cursor.execute(self.POLL_QUERY, (f"{config.ALERT_SLOW_QUERY_SECONDS} seconds",))
+            await _async_wait(target.conn)
+            metrics, slow_queries = cursor.fetchone()
+        finally:
+            cursor.close()
+        
+        return PostgreSQLManager.decode_metrics(metrics), slow_queries
+    
+    async def _poll_target(self, target: PollTarget):
+        """Bitta target loop i: interval, timeout va xatoda eksponensial backoff"""
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        # Birinchi namunalar interval bo'ylab tarqatiladi - hamma target bir paytda ulanmaydi
+        delay = zlib.crc32(target.name.encode('utf-8')) % 1000 / 1000 * target.interval
+        try:
+            while await self._sleep(delay):
+                started = loop.time()
+                try:
+                    async with self._semaphore:
+                        metrics, slow_queries = await asyncio.wait_for(self._sample(target), target.timeout)
+                except Exception as e:
+                    # Timeout da so'rov o'rtada qolgan - ulanishni qayta ishlatib bo'lmaydi
+                    self._close(target)
+                    target.failures += 1
+                    target.last_error = str(e) or type(e).__name__
+                    delay = min(target.interval * 2 ** target.failures, config.DAEMON_MAX_BACKOFF)
+                    logger.error(f"[{target.name}] Poll failed ({target.failures}x, "
+                                 f"retry in {delay:.0f}s): {target.last_error}")
+                    continue
+                
+                target.failures = 0
+                target.last_error = None
+                target.samples += 1
+                target.last_sample = time.time()
+                if target.interval >= config.POLLER_IDLE_DISCONNECT:
+                    self._close(target)
+                
+                try:
+                    # Handler fayl/SQLite ga yozadi (fsync) - event loop ni to'xtatmasligi uchun thread da
+                    await loop.run_in_executor(_shared_executor(self.concurrency), self.on_sample,
+                                               target.name, metrics, slow_queries)
+                except Exception as e:
+                    logger.error(f"[{target.name}] Sample handler failed: {e}")
+                
+                delay = max(0.0, target.interval - (loop.time() - started))
+        finally:
+            self._close(target)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Poller holati"""
+        targets = list(self.targets.values())
+        return {
+            'targets': len(targets),
+            'connected': sum(1 for t in targets if t.conn is not None),
+            'failing': sum(1 for t in targets if t.failures),
+            'samples': sum(t.samples for t in targets)
+        }
+
 # ============================================================================
 # ULTIMATE UI - IKKI QISIMGA BO'LINGAN MENYU
 # ============================================================================
@@ -2365,6 +5542,9 @@ class UltimateUI:
             input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
             return
         
+        if self.current_deployment:
+            self.current_pg_manager.deployment_name = self.current_deployment
+            self.current_pg_manager.timeseries = self.deployment_manager.get_timeseries(self.current_deployment)
         self.current_pg_manager.start_monitoring()
         logger.success("Monitoring started")
         input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
@@ -2433,6 +5613,58 @@ class UltimateUI:
         
         input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
     
+    def _metrics_history_ui(self):
+        """Metrikalar tarixi UI"""
+        if self.current_deployment:
+            source = self.deployment_manager.get_timeseries(self.current_deployment)
+        elif self.current_pg_manager:
+            source = None
+        else:
+            logger.error("Please select a deployment first")
+            input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
+            return
+        
+        self.clear_screen()
+        print(f"{Fore.CYAN}╔{'═' * 80}╗{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}║{Fore.YELLOW}{' ' * 30}📜 METRICS HISTORY{' ' * 33}{Fore.CYAN}║{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}╚{'═' * 80}╝{Style.RESET_ALL}")
+        print()
+        
+        hours = input(f"{Fore.GREEN}Period in hours [24]: {Style.RESET_ALL}").strip()
+        try:
+            hours = float(hours) if hours else 24.0
+        except ValueError:
+            logger.error("Invalid period")
+            input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
+            return
+        
+        start = time.time() - hours * 3600
+        if source is not None:
+            stats = source.summarize(start)
+        else:
+            # Deployment tanlanmagan - faqat xotiradagi tarix
+            columns = self.current_pg_manager.metrics_history.range(start)
+            stats = {}
+            for name in METRIC_NAMES:
+                values = [v for v in columns[name] if v == v]
+                stats[name] = {
+                    'samples': len(values),
+                    'min': min(values) if values else float('nan'),
+                    'avg': sum(values) / len(values) if values else float('nan'),
+                    'max': max(values) if values else float('nan'),
+                    'last': values[-1] if values else float('nan')
+                }
+        
+        from prettytable import PrettyTable
+        table = PrettyTable(['Metric', 'Samples', 'Min', 'Avg', 'Max', 'Last'])
+        table.align['Metric'] = 'l'
+        for name, entry in stats.items():
+            table.add_row([name, entry['samples'], f"{entry['min']:,.2f}", f"{entry['avg']:,.2f}",
+                           f"{entry['max']:,.2f}", f"{entry['last']:,.2f}"])
+        print(table)
+        
+        input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
+    
     def _generate_local_client_ui(self):
         """Local Python client generator"""
         self.clear_screen()
@@ -2476,11 +5708,17 @@ class PostgreSQLClient:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger('PostgreSQL-Client')
     
+    ROW_FACTORIES = {
+        'dict': extras.RealDictCursor,
+        'record': extras.NamedTupleCursor,
+        'tuple': None
+    }
+    
     @contextmanager
-    def get_cursor(self):
+    def get_cursor(self, cursor_factory=extras.RealDictCursor):
         conn = self.pool.getconn()
         try:
-            yield conn.cursor(cursor_factory=extras.RealDictCursor)
+            yield conn.cursor(cursor_factory=cursor_factory)
             conn.commit()
         except Exception as e:
             conn.rollback()
@@ -2488,11 +5726,28 @@ class PostgreSQLClient:
         finally:
             self.pool.putconn(conn)
     
-    def execute(self, query: str, params: tuple = None, fetch=True):
-        with self.get_cursor() as cur:
+    def execute(self, query: str, params: tuple = None, fetch=True, row_format='dict'):
+        """row_format: dict | record (namedtuple) | tuple"""
+        with self.get_cursor(self.ROW_FACTORIES[row_format]) as cur:
             cur.execute(query, params)
             return cur.fetchall() if fetch and cur.description else None
     
+    def stream(self, query: str, params: tuple = None, itersize: int = 2000):
+        """Server-side cursor - katta jadvallarni doimiy xotirada o'qish"""
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor(name='client_stream', cursor_factory=extras.RealDictCursor) as cur:
+                cur.itersize = itersize
+                cur.execute(query, params)
+                for row in cur:
+                    yield row
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+    
     def insert(self, table: str, data: Dict):
         columns = ', '.join(data.keys())
         placeholders = ', '.join(['%s'] * len(data))
@@ -2642,12 +5897,18 @@ class ProductionPostgreSQLClient:
             return None
         return wrapper
     
+    ROW_FACTORIES = {
+        'dict': psycopg2.extras.RealDictCursor,
+        'record': psycopg2.extras.NamedTupleCursor,
+        'tuple': None
+    }
+    
     @contextmanager
     @retry_on_failure
-    def get_cursor(self):
+    def get_cursor(self, cursor_factory=psycopg2.extras.RealDictCursor):
         conn = self.pool.getconn()
         try:
-            yield conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            yield conn.cursor(cursor_factory=cursor_factory)
             conn.commit()
         except Exception as e:
             conn.rollback()
@@ -2657,12 +5918,36 @@ class ProductionPostgreSQLClient:
             self.pool.putconn(conn)
     
     @retry_on_failure
-    def execute(self, query: str, params: tuple = None, fetch: bool = True):
+    def execute(self, query: str, params: tuple = None, fetch: bool = True,
+                row_format: str = 'dict'):
+        """row_format: dict | record (namedtuple) | tuple"""
         self.metrics['queries'] += 1
-        with self.get_cursor() as cur:
+        with self.get_cursor(self.ROW_FACTORIES[row_format]) as cur:
             cur.execute(query, params)
             return cur.fetchall() if fetch and cur.description else None
     
+    def stream(self, query: str, params: tuple = None, itersize: int = 2000):
+        """Server-side cursor - katta jadvallarni doimiy xotirada o'qish"""
+        self.metrics['queries'] += 1
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor(name='client_stream',
+                             cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.itersize = itersize
+                cur.execute(query, params)
+                for row in cur:
+                    yield row
+            conn.commit()
+        except GeneratorExit:
+            conn.rollback()
+            raise
+        except Exception:
+            conn.rollback()
+            self.metrics['errors'] += 1
+            raise
+        finally:
+            self.pool.putconn(conn)
+    
     def health_check(self) -> Dict:
         try:
             start = time.time()
@@ -2829,7 +6114,6 @@ if __name__ == '__main__':
     def _generate_env_file_ui(self): self._not_implemented()
     def _view_alerts_ui(self): self._not_implemented()
     def _alert_settings_ui(self): self._not_implemented()
-    def _metrics_history_ui(self): self._not_implemented()
     def _performance_report_ui(self): self._not_implemented()
     def _scheduled_backup_ui(self): self._not_implemented()
     def _pitr_ui(self): self._not_implemented()
@@ -2844,6 +6128,524 @@ if __name__ == '__main__':
         logger.warning("This feature will be available in the next update")
         input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}")
 
+# ============================================================================
+# DAEMON - HEADLESS SERVICE
+# ============================================================================
+
+def sd_notify(state: str) -> bool:
+    """systemd ga holat yuborish (READY=1, WATCHDOG=1, STOPPING=1, STATUS=...)
+    
+    NOTIFY_SOCKET bo'lmasa (systemd siz ishga tushirilgan) hech narsa qilmaydi.
+    """
+    address = os.environ.get('NOTIFY_SOCKET')
+    if not address:
+        return False
+    
+    import socket
+    if address.startswith('@'):
+        address = '\0' + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC) as sock:
+            sock.connect(address)
+            sock.sendall(state.encode('utf-8'))
+        return True
+    except OSError as e:
+        logger.warning(f"sd_notify failed: {e}")
+        return False
+
+@dataclass
+class DaemonTarget:
+    """Daemon kuzatayotgan bitta deployment holati"""
+    name: str
+    url_name: str
+    manager: Optional[PostgreSQLManager] = None
+    next_backup: float = 0.0
+    failures: int = 0
+    running: set = field(default_factory=set)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+class UltimateDaemon:
+    """TTY siz ishlaydigan xizmat: monitoring, rejali backup va alert lar
+    
+    Metrikalar alohida thread dagi AsyncMetricsPoller event loop ida yig'iladi;
+    scheduler loop muddati kelgan backup larni thread pool ga beradi. SIGTERM da
+    yangi ishlar to'xtatiladi va boshlanganlari DAEMON_DRAIN_TIMEOUT gacha kutiladi.
+    """
+    
+    def __init__(self, only: Sequence[str] = None, backups: bool = None):
+        self.only = set(only or ())
+        self.backups = config.AUTO_BACKUP_ENABLED if backups is None else backups
+        self.url_manager = DatabaseURLManager()
+        self.deployment_manager = DeploymentManager()
+        self.targets: Dict[str, DaemonTarget] = {}
+        self.stop_event = threading.Event()
+        self.reload_requested = True
+        self.futures: Dict[Any, Tuple[DaemonTarget, str]] = {}
+        self.poller = AsyncMetricsPoller(self._on_sample)
+        
+        watchdog_usec = int(os.environ.get('WATCHDOG_USEC', 0) or 0)
+        self.watchdog_interval = watchdog_usec / 2e6 if watchdog_usec else None
+    
+    def _install_signal_handlers(self):
+        def stop(signum, frame):
+            logger.info(f"Received {signal.Signals(signum).name}, draining")
+            self.stop_event.set()
+        
+        def reload(signum, frame):
+            self.reload_requested = True
+        
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGHUP, reload)
+    
+    @staticmethod
+    def _is_backup_of(entry: os.DirEntry, database: str) -> bool:
+        """backup_database yaratgan fayl nomi shakli - "app" prefiksi "app_prod" backup lariga mos kelmasin"""
+        return (re.fullmatch(rf"{re.escape(database)}_\d{{8}}_\d{{6}}(_schema|_data)?\.(dump|sql)(\.gz)?",
+                             entry.name) is not None
+                and entry.is_file(follow_symlinks=False))
+    
+    def _last_backup_time(self, database: str) -> float:
+        """Oxirgi backup fayli vaqti (qayta ishga tushganda backup takrorlanmasligi uchun)"""
+        latest = 0.0
+        try:
+            with os.scandir(config.BACKUP_DIR) as entries:
+                for entry in entries:
+                    if self._is_backup_of(entry, database):
+                        latest = max(latest, entry.stat().st_mtime)
+        except FileNotFoundError:
+            pass
+        return latest
+    
+    def reload_targets(self):
+        """Deployment lar ro'yxatini qayta o'qish"""
+        self.reload_requested = False
+        wanted = {}
+        for name, deployment in self.deployment_manager.list_deployments():
+            if self.only and name not in self.only:
+                continue
+            if deployment.get('status') == 'stopped':
+                continue
+            wanted[name] = deployment
+        
+        for name in list(self.targets):
+            target = self.targets[name]
+            deployment = wanted.get(name)
+            if (not deployment or deployment['url_name'] != target.url_name) and not target.running:
+                if target.manager:
+                    target.manager.close()
+                del self.targets[name]
+                self.poller.remove_target(name)
+                logger.info(f"Stopped watching deployment {name}")
+        
+        self.url_manager.refresh()
+        for name, deployment in wanted.items():
+            url = self.url_manager.get_url(deployment['url_name'])
+            if not url:
+                logger.warning(f"[{name}] URL '{deployment['url_name']}' not found")
+                continue
+            
+            # Poller o'zgarmagan target ni qayta yaratmaydi
+            self.poller.add_target(name, url, interval=deployment.get('config', {}).get('monitor_interval'))
+            if name not in self.targets:
+                target = DaemonTarget(name=name, url_name=deployment['url_name'])
+                last_backup = self._last_backup_time(url.database) if url.database else 0.0
+                if last_backup:
+                    target.next_backup = last_backup + config.AUTO_BACKUP_INTERVAL
+                self.targets[name] = target
+                logger.info(f"Watching deployment {name}")
+        
+        sd_notify(f"STATUS=Watching {len(self.targets)} deployments")
+    
+    def _connect(self, target: DaemonTarget) -> PostgreSQLManager:
+        """Deployment uchun PostgreSQLManager (backup ishlari uchun)"""
+        with target.lock:
+            if target.manager is None:
+                url = self.url_manager.get_url(target.url_name)
+                if not url:
+                    raise ValueError(f"URL '{target.url_name}' not found")
+                manager = PostgreSQLManager(url)
+                manager.deployment_name = target.name
+                manager.timeseries = self.deployment_manager.get_timeseries(target.name)
+                target.manager = manager
+            return target.manager
+    
+    def _on_sample(self, name: str, metrics: Dict[str, Any], slow_queries: int):
+        """Poller namunasi: saqlash va alert larni baholash (umumiy thread pool da)"""
+        self.deployment_manager.add_metrics(name, metrics)
+        
+        alerts = evaluate_alerts(metrics, slow_queries)
+        for alert in alerts:
+            logger.warning(f"[{name}] {alert['message']}")
+        if alerts and config.REGISTRY_BACKEND == 'sqlite':
+            get_registry().add_alerts(name, alerts)
+    
+    def _run_poller(self):
+        """Poller event loop i (alohida thread)"""
+        import asyncio
+        
+        try:
+            asyncio.run(self.poller.run(drain_timeout=config.DAEMON_DRAIN_TIMEOUT))
+        except Exception as e:
+            logger.critical(f"Metrics poller crashed: {e}")
+    
+    def _run_backup(self, target: DaemonTarget):
+        """Rejali backup va eski backup larni tozalash"""
+        manager = self._connect(target)
+        database = manager.database_url.database
+        if not manager.backup_database(database):
+            raise RuntimeError(f"Backup of {database} failed")
+        
+        if config.AUTO_CLEANUP_ENABLED:
+            cutoff = time.time() - config.AUTO_CLEANUP_DAYS * 86400
+            with os.scandir(config.BACKUP_DIR) as entries:
+                for entry in entries:
+                    if self._is_backup_of(entry, database) and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        logger.info(f"🧹 Removed old backup {entry.name}")
+    
+    def _schedule(self, executor):
+        """Muddati kelgan backup larni pool ga berish"""
+        if not self.backups:
+            return
+        
+        now = time.time()
+        for target in self.targets.values():
+            if 'backup' in target.running or now < target.next_backup:
+                continue
+            target.running.add('backup')
+            self.futures[executor.submit(self._run_backup, target)] = (target, 'backup')
+    
+    def _finish(self, future):
+        """Tugagan ish natijasi - keyingi vaqtni rejalash, xatoda backoff"""
+        target, kind = self.futures.pop(future)
+        target.running.discard(kind)
+        now = time.time()
+        
+        error = future.exception()
+        if error is None:
+            target.failures = 0
+            target.next_backup = now + config.AUTO_BACKUP_INTERVAL
+            return
+        
+        target.failures += 1
+        # Backup - uzoq ish, qayta urinish ham backup oralig'i miqyosida
+        delay = min(config.DAEMON_BACKUP_RETRY * 2 ** (target.failures - 1),
+                    max(config.AUTO_BACKUP_INTERVAL, config.DAEMON_BACKUP_RETRY))
+        logger.error(f"[{target.name}] {kind} failed ({target.failures}x, retry in {delay:.0f}s): {error}")
+        target.next_backup = now + delay
+        
+        # Ulanish muammosi bo'lsa pool keyingi safar qayta yaratiladi
+        if isinstance(error, psycopg2.OperationalError) and target.manager and not target.running:
+            target.manager.close()
+            target.manager = None
+    
+    def run(self) -> int:
+        """Asosiy loop - SIGTERM gacha ishlaydi"""
+        import concurrent.futures
+        
+        self._install_signal_handlers()
+        config.ensure_dirs()
+        # Ko'p deployment uchun har birida bittadan iliq ulanish yetarli
+        config.POOL_MIN_SIZE = 1
+        
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=config.DAEMON_WORKERS,
+                                                         thread_name_prefix='pgu-daemon')
+        poller_thread = threading.Thread(target=self._run_poller, name='pgu-poller', daemon=True)
+        last_reload = last_watchdog = 0.0
+        logger.success("🛰️ Daemon started")
+        sd_notify("READY=1")
+        
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                if self.reload_requested or now - last_reload >= config.DAEMON_RELOAD_INTERVAL:
+                    self.reload_targets()
+                    last_reload = now
+                
+                if not poller_thread.is_alive():
+                    if poller_thread.ident is not None:
+                        return EXIT_FAILURE
+                    poller_thread.start()
+                
+                self._schedule(executor)
+                
+                done, _ = concurrent.futures.wait(list(self.futures), timeout=0)
+                for future in done:
+                    self._finish(future)
+                
+                if self.watchdog_interval and now - last_watchdog >= self.watchdog_interval:
+                    sd_notify("WATCHDOG=1")
+                    last_watchdog = now
+                
+                self.stop_event.wait(min(1.0, config.MONITOR_INTERVAL))
+        finally:
+            sd_notify(f"STOPPING=1\nSTATUS=Draining {len(self.futures)} jobs")
+            self.poller.stop()
+            done, pending = concurrent.futures.wait(list(self.futures), timeout=config.DAEMON_DRAIN_TIMEOUT)
+            for future in done:
+                self._finish(future)
+            if pending:
+                logger.warning(f"Drain timeout: abandoning {len(pending)} running jobs")
+            executor.shutdown(wait=False, cancel_futures=True)
+            if poller_thread.is_alive():
+                poller_thread.join(config.DAEMON_DRAIN_TIMEOUT)
+            
+            self.deployment_manager.flush_metrics()
+            for target in self.targets.values():
+                if target.manager and not target.running:
+                    target.manager.close()
+            logger.info("🛰️ Daemon stopped")
+        
+        return EXIT_OK
+
+# ============================================================================
+# CLI - NON-INTERACTIVE MODE
+# ============================================================================
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_CONNECTION = 3
+
+OUTPUT_FORMATS = ('json', 'ndjson', 'table')
+
+def _emit(data: Any, output_format: str):
+    """Natijani stdout ga chiqarish: json | ndjson | table"""
+    rows = data if isinstance(data, list) else [data]
+    
+    if output_format == 'ndjson':
+        for row in rows:
+            sys.stdout.write(json.dumps(row, default=str, ensure_ascii=False) + '\n')
+    elif output_format == 'table' and rows and all(isinstance(row, dict) for row in rows):
+        from prettytable import PrettyTable
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        table = PrettyTable(columns)
+        for row in rows:
+            table.add_row([row.get(column, '') for column in columns])
+        print(table)
+    else:
+        print(json.dumps(data, default=str, ensure_ascii=False, indent=2))
+
+def build_cli():
+    """Subcommand CLI (click faqat shu yerda import qilinadi)"""
+    import click
+    
+    def fail(ctx, message: str, code: int = EXIT_FAILURE):
+        click.echo(json.dumps({'error': message}, ensure_ascii=False), err=True)
+        ctx.exit(code)
+    
+    def get_manager(ctx) -> PostgreSQLManager:
+        """--url / --url-name / --deployment dan PostgreSQLManager (bir marta yaratiladi)"""
+        options = ctx.find_root().obj
+        if options.get('manager'):
+            return options['manager']
+        
+        url = None
+        if options['url']:
+            try:
+                url = DatabaseURL.from_string(options['url'])
+            except ValueError as e:
+                raise click.UsageError(str(e))
+        elif options['url_name'] or options['deployment']:
+            url_name = options['url_name']
+            if options['deployment']:
+                deployment = DeploymentManager().get_deployment(options['deployment'])
+                if not deployment:
+                    fail(ctx, f"Deployment '{options['deployment']}' not found", EXIT_USAGE)
+                url_name = deployment['url_name']
+            url = DatabaseURLManager().get_url(url_name)
+            if not url:
+                fail(ctx, f"URL '{url_name}' not found", EXIT_USAGE)
+        else:
+            raise click.UsageError("one of --url, --url-name or --deployment is required")
+        
+        # Bir martalik ishlar uchun katta pool kerak emas
+        config.POOL_MIN_SIZE = 1
+        try:
+            manager = PostgreSQLManager(url)
+        except Exception as e:
+            fail(ctx, f"Connection failed: {e}", EXIT_CONNECTION)
+        
+        options['manager'] = manager
+        ctx.find_root().call_on_close(manager.close)
+        return manager
+    
+    def run(ctx, func: Callable, *args, **kwargs) -> Any:
+        """Amalni bajarish - xatolar JSON ko'rinishida stderr ga, mos exit code bilan"""
+        try:
+            return func(*args, **kwargs)
+        except psycopg2.OperationalError as e:
+            fail(ctx, str(e).strip(), EXIT_CONNECTION)
+        except Exception as e:
+            fail(ctx, str(e).strip())
+    
+    def output(ctx, data: Any):
+        _emit(data, ctx.find_root().obj['format'])
+    
+    @click.group(context_settings={'help_option_names': ['-h', '--help']})
+    @click.option('--url', envvar='PGU_DATABASE_URL', help="postgresql:// URL")
+    @click.option('--url-name', help="Ro'yxatdan o'tgan URL nomi")
+    @click.option('--deployment', help="Deployment nomi")
+    @click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='json',
+                  show_default=True)
+    @click.option('-v', '--verbose', is_flag=True, help="INFO loglarini stderr ga chiqarish")
+    @click.pass_context
+    def cli(ctx, url, url_name, deployment, output_format, verbose):
+        """PostgreSQL Ultimate - non-interactive mode"""
+        logger.set_console_level(logging.INFO if verbose else logging.WARNING)
+        ctx.obj = {'url': url, 'url_name': url_name, 'deployment': deployment,
+                   'format': output_format}
+    
+    @cli.group()
+    def databases():
+        """Database lar"""
+    
+    @databases.command('list')
+    @click.option('--no-sizes', is_flag=True, help="pg_database_size siz tezkor rejim")
+    @click.pass_context
+    def databases_list(ctx, no_sizes):
+        """Database lar ro'yxati"""
+        manager = get_manager(ctx)
+        output(ctx, run(ctx, manager.list_databases, include_sizes=not no_sizes))
+    
+    @cli.group()
+    def users():
+        """Userlar"""
+    
+    @users.command('list')
+    @click.option('--pattern', help="ILIKE shabloni, masalan 'app_%'")
+    @click.option('--login-only', is_flag=True, help="Faqat LOGIN huquqli rollar")
+    @click.option('--limit', type=int, help="Sahifa hajmi")
+    @click.option('--offset', type=int, default=0, show_default=True)
+    @click.pass_context
+    def users_list(ctx, pattern, login_only, limit, offset):
+        """Userlar ro'yxati"""
+        manager = get_manager(ctx)
+        output(ctx, run(ctx, manager.list_users, pattern=pattern, login_only=login_only,
+                        limit=limit, offset=offset))
+    
+    @users.command('privileges')
+    @click.argument('usernames', nargs=-1, required=True)
+    @click.option('--type', 'object_types', multiple=True,
+                  type=click.Choice(list(PostgreSQLManager.PRIVILEGE_TYPES)),
+                  help="Obyekt turi (bir necha marta berish mumkin)")
+    @click.option('--include-denied', is_flag=True, help="Ruxsat yo'q obyektlarni ham ko'rsatish")
+    @click.pass_context
+    def users_privileges(ctx, usernames, object_types, include_denied):
+        """User(lar) ruxsatlari - bir nechta user ni solishtirish mumkin"""
+        manager = get_manager(ctx)
+        output(ctx, run(ctx, lambda: list(manager.iter_user_privileges(usernames, object_types or None,
+                                                                       include_denied))))
+    
+    @cli.command()
+    @click.pass_context
+    def metrics(ctx):
+        """Joriy metrikalar"""
+        manager = get_manager(ctx)
+        output(ctx, run(ctx, manager.get_metrics))
+    
+    @cli.command()
+    @click.argument('db_name')
+    @click.option('--type', 'backup_type', type=click.Choice(['full', 'schema', 'data', 'plain']),
+                  default='full', show_default=True)
+    @click.option('--no-compress', is_flag=True)
+    @click.pass_context
+    def backup(ctx, db_name, backup_type, no_compress):
+        """Database backup (pg_dump)"""
+        manager = get_manager(ctx)
+        backup_file = run(ctx, manager.backup_database, db_name, backup_type, compress=not no_compress)
+        if not backup_file:
+            fail(ctx, f"Backup of '{db_name}' failed")
+        output(ctx, {'database': db_name, 'file': backup_file,
+                     'size_bytes': os.path.getsize(backup_file)})
+    
+    def import_result(ctx, manager: PostgreSQLManager, failed: int):
+        stats = manager.last_import_stats
+        output(ctx, stats)
+        # Qisman import ham xato - to'xtagan joy resume_offset da
+        if failed or stats.get('resume_offset') is not None or stats.get('error'):
+            ctx.exit(EXIT_FAILURE)
+    
+    @cli.command('import-csv')
+    @click.argument('table')
+    @click.argument('csv_file', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--delimiter', default=',', show_default=True)
+    @click.option('--no-header', is_flag=True)
+    @click.option('--chunk-size', type=int)
+    @click.option('--start-offset', type=int, default=0, help="Oldingi importning resume_offset qiymati")
+    @click.option('--encoding', default='utf-8', show_default=True)
+    @click.option('--workers', type=int, default=1, show_default=True)
+    @click.pass_context
+    def import_csv(ctx, table, csv_file, delimiter, no_header, chunk_size, start_offset, encoding, workers):
+        """CSV faylni jadvalga import qilish"""
+        manager = get_manager(ctx)
+        _, failed = run(ctx, manager.import_csv, table, csv_file, delimiter=delimiter,
+                        header=not no_header, chunk_size=chunk_size, start_offset=start_offset,
+                        encoding=encoding, workers=workers)
+        import_result(ctx, manager, failed)
+    
+    @cli.command('import-json')
+    @click.argument('table')
+    @click.argument('json_file', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--batch-size', type=int)
+    @click.option('--json-format', type=click.Choice(['auto', 'ndjson', 'array', 'object']),
+                  default='auto', show_default=True)
+    @click.option('--workers', type=int, default=1, show_default=True)
+    @click.pass_context
+    def import_json(ctx, table, json_file, batch_size, json_format, workers):
+        """JSON / NDJSON faylni jadvalga import qilish"""
+        manager = get_manager(ctx)
+        _, failed = run(ctx, manager.import_json, table, json_file, batch_size=batch_size,
+                        json_format=json_format, workers=workers)
+        import_result(ctx, manager, failed)
+    
+    @cli.command()
+    @click.option('--only', multiple=True, help="Faqat shu deployment lar (bir necha marta berish mumkin)")
+    @click.option('--no-backups', is_flag=True, help="Rejali backup larni o'chirish")
+    def daemon(only, no_backups):
+        """Headless xizmat: monitoring, backup, alert lar (systemd uchun)"""
+        logger.set_console_level(logging.INFO)
+        sys.exit(UltimateDaemon(only=only, backups=False if no_backups else None).run())
+    
+    @cli.group()
+    def urls():
+        """Ro'yxatdan o'tgan URL lar"""
+    
+    @urls.command('list')
+    @click.option('--search', help='Qidiruv: "matn tag:eu env:prod host:db1"')
+    @click.pass_context
+    def urls_list(ctx, search):
+        """URL lar ro'yxati (parollarsiz)"""
+        manager = DatabaseURLManager()
+        items = manager.search_urls(search) if search else manager.list_urls()
+        output(ctx, [{
+            'name': name,
+            'url': url.to_string(hide_password=True),
+            'host': url.host,
+            'database': url.database,
+            'tags': url.tags,
+            'description': url.description
+        } for name, url in items])
+    
+    @cli.group()
+    def deployments():
+        """Deployment lar"""
+    
+    @deployments.command('list')
+    @click.option('--environment', type=click.Choice([env.name.lower() for env in EnvironmentType]))
+    @click.pass_context
+    def deployments_list(ctx, environment):
+        """Deployment lar ro'yxati"""
+        manager = DeploymentManager()
+        if environment:
+            items = manager.list_by_environment(EnvironmentType[environment.upper()])
+        else:
+            items = [deployment for _, deployment in manager.list_deployments()]
+        output(ctx, items)
+    
+    return cli
+
 # ============================================================================
 # MAIN ENTRY POINT
 # ============================================================================
@@ -2851,6 +6653,11 @@ if __name__ == '__main__':
 def main():
     """Dasturni ishga tushirish"""
     
+    # Argumentlar bilan - interaktiv UI siz CLI rejimi
+    if len(sys.argv) > 1:
+        build_cli()(prog_name=os.path.basename(sys.argv[0]))
+        return
+    
     # Root huquqini tekshirish
     if os.geteuid() != 0:
         print(f"{Fore.YELLOW}⚠️  Running without root privileges - some features may be limited{Style.RESET_ALL}")
@@ -2859,6 +6666,8 @@ def main():
         time.sleep(2)
     
     try:
+        config.ensure_dirs()
+        
         # Signal handlers
         def signal_handler(sig, frame):
             print(f"\n{Fore.YELLOW}⚠️  System interrupted{Style.RESET_ALL}")
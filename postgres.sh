@@ -1628,9 +1628,14 @@ After=network.target postgresql.service
 Requires=postgresql.service
 
 [Service]
-Type=simple
+Type=notify
+NotifyAccess=main
 User=root
-ExecStart=/usr/bin/python3 ${SCRIPT_DIR}/postgres_ultimate.py
+ExecStart=/usr/bin/python3 ${SCRIPT_DIR}/postgres.py daemon
+ExecReload=/bin/kill -HUP \$MAINPID
+WatchdogSec=60
+TimeoutStopSec=45
+KillSignal=SIGTERM
 Restart=always
 RestartSec=10
 StandardOutput=journal